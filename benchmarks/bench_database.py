@@ -0,0 +1,49 @@
+import random
+import tempfile
+import time
+
+from common import measure, print_results
+from pysplitter.core import database, sqlite_database
+
+
+attempt_numbers = [1_000, 10_000, 100_000]
+segment_number = 20
+batch_size = 10_000
+backends = {"json": database, "sqlite": sqlite_database}
+
+
+def get_run(rng, segment_names):
+    reset_segment = rng.randrange(2*segment_number)  # About half of the runs are reset
+    segment_times = {name: rng.lognormvariate(3.5, 0.2) if i < reset_segment else None
+                        for i, name in enumerate(segment_names)}
+    final_time = sum(segment_times.values()) if reset_segment >= segment_number else None
+    return segment_times, final_time
+
+
+def fill_database(database_module, database_dir, speedrun_name, segment_names, attempt_number):
+    rng = random.Random(0)
+    for start in range(0, attempt_number, batch_size):
+        database_module.append_runs_to_database(database_dir, speedrun_name, [
+                (*get_run(rng, segment_names), time.time_ns())
+                    for _ in range(min(batch_size, attempt_number-start))
+            ])
+
+
+def run():
+    results = {}
+    segment_names = [f"segment {i}" for i in range(segment_number)]
+    rng = random.Random(1)
+    for backend, database_module in backends.items():
+        for attempt_number in attempt_numbers:
+            with tempfile.TemporaryDirectory() as directory:
+                fill_database(database_module, directory, "benchmark", segment_names, attempt_number)
+                segment_times, final_time = get_run(rng, segment_names)
+                results[f"database/update_database/{backend}/{attempt_number} attempts"] = measure(
+                        lambda: database_module.update_database(directory, "benchmark", segment_times, final_time),
+                        number=10, repeat=3
+                    )
+    return results
+
+
+if __name__ == "__main__":
+    print_results(run())
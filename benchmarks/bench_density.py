@@ -0,0 +1,44 @@
+import numpy as np
+from scipy.stats import gaussian_kde
+
+from common import measure, print_results
+from pysplitter.core.density import estimate_densities
+
+
+segment_number = 20
+sample_numbers = [10_000, 100_000]
+point_number = 300
+
+
+def get_samples(sample_number, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.lognormal(np.log(30+10*i), 0.2, sample_number) for i in range(segment_number)]
+
+
+def evaluate_with_scipy(samples):
+    return [gaussian_kde(segment_samples, bw_method=0.5).evaluate(np.linspace(segment_samples.min(), segment_samples.max(), point_number))
+                for segment_samples in samples]
+
+
+def get_max_relative_error(samples):
+    _, densities = estimate_densities(samples, point_number=point_number)
+    return max(np.max(np.abs(density-reference))/np.max(reference)
+                for density, reference in zip(densities, evaluate_with_scipy(samples)))
+
+
+def run():
+    results = {}
+    for sample_number in sample_numbers:
+        samples = get_samples(sample_number)
+        name = f"{segment_number} segments/{sample_number} samples"
+        results[f"density/binned/{name}"] = \
+                measure(lambda: estimate_densities(samples, point_number=point_number), number=1, repeat=3)
+        results[f"density/gaussian_kde/{name}"] = measure(lambda: evaluate_with_scipy(samples), number=1, repeat=3)
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{segment_number} segments, {point_number} points per segment")
+    print_results(run())
+    for sample_number in sample_numbers:
+        print(f"{sample_number:>7} samples: max relative error {get_max_relative_error(get_samples(sample_number)):.1e}")
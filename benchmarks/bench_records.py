@@ -0,0 +1,102 @@
+import os
+import tempfile
+
+from common import measure, print_results
+from pysplitter.core import codec
+from pysplitter.core.records import SpeedrunRecords
+
+
+segment_numbers = [10, 100, 1000]
+
+
+# Validator used before validators were compiled, for comparison
+def recursive_is_correct_type(value, types):
+    if not isinstance(value, types[0]):
+        return False
+    else:
+        if len(types) > 1:
+            for el in value:
+                if not recursive_is_correct_type(el, [t for t in types[1:]]):
+                    return False
+    return True
+
+
+def get_records_content(segment_number):
+    return {
+            "name": "benchmark",
+            "segment_names": [f"segment {i}" for i in range(segment_number)],
+            "pb": float(segment_number),
+            "pb_splits": [1.+i/segment_number for i in range(segment_number)],
+            "best_splits": [0.5+i/segment_number for i in range(segment_number)],
+            "run_count": 1000,
+        }
+
+
+def get_run(content, split_offset):
+    segment_times = {name: split+split_offset for name, split in zip(content["segment_names"], content["pb_splits"])}
+    return segment_times, sum(segment_times.values())
+
+
+def bench_validators(content):
+    def validate_recursively():
+        for information, types in SpeedrunRecords.information_types.items():
+            if information in content:
+                recursive_is_correct_type(content[information], types)
+
+    return {
+            "recursive": measure(validate_recursively),
+            "compiled": measure(lambda: SpeedrunRecords.validate_records_file_content(content)),
+        }
+
+
+def bench_codecs(content, directory):
+    results = {}
+    file_name = os.path.join(directory, "records.json")
+    default_codec = codec.codec
+    for name, records_codec in codec.codecs.items():
+        codec.codec = records_codec
+        records = SpeedrunRecords(**content)
+        records.write_to_file(file_name)
+
+        results[name] = {
+                "load_from_file": measure(lambda: SpeedrunRecords.load_from_file(file_name)),
+                "dumps": measure(records.dumps),
+                "write_to_file": measure(lambda: records.write_to_file(file_name), number=20),
+            }
+    codec.codec = default_codec
+    return results
+
+
+def bench_update_times(segment_number):
+    content = get_records_content(segment_number)
+    records = SpeedrunRecords(**get_records_content(segment_number))
+    slower_run = get_run(content, 1.)
+    faster_run = get_run(content, -0.1)
+
+    def update_with_pb():
+        records.pb = None
+        records.update_times(*faster_run)
+
+    return {
+            "slower run": measure(lambda: records.update_times(*slower_run)),
+            "new pb": measure(update_with_pb),
+        }
+
+
+def run():
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for segment_number in segment_numbers:
+            content = get_records_content(segment_number)
+            for name, duration in bench_validators(content).items():
+                results[f"records/validation/{name}/{segment_number} segments"] = duration
+            for codec_name, codec_results in bench_codecs(content, directory).items():
+                for operation, duration in codec_results.items():
+                    results[f"records/{operation}/{codec_name}/{segment_number} segments"] = duration
+            for name, duration in bench_update_times(segment_number).items():
+                results[f"records/update_times/{name}/{segment_number} segments"] = duration
+    return results
+
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,30 @@
+import os
+import tempfile
+
+from common import measure, print_results
+from pysplitter.core.splitter import Splitter
+from pysplitter.core.recovery import RecoveryRing
+from pysplitter.core.clock import FakeClock
+
+
+segment_number = 50
+
+
+def run():
+    clock = FakeClock()
+    splitter = Splitter([str(i) for i in range(segment_number)], clock=clock)
+    for i in range(segment_number//2):
+        clock.advance(10.)
+        splitter.split()
+
+    with tempfile.TemporaryDirectory() as directory:
+        ring = RecoveryRing(os.path.join(directory, "recovery.ring"), segment_number+1)
+        timestamps = splitter.get_split_timestamps()
+        split_cost = measure(lambda: ring.record_splits(timestamps), number=100_000)
+        ring.close()
+
+    return {f"recovery/record_splits/{segment_number} segments": split_cost}
+
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,68 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5 import QtWidgets
+
+from common import measure, print_results
+from pysplitter.core.splitter import Splitter
+from pysplitter.core.records import SpeedrunRecords
+from pysplitter.core.clock import FakeClock
+from pysplitter.ui.segments import SegmentsView
+
+
+segment_numbers = [10, 100]
+split_duration = 10.
+
+
+def get_view(segment_number, clock):
+    segment_names = [f"segment {i}" for i in range(segment_number)]
+    records = SpeedrunRecords("benchmark", segment_names, pb_splits=[split_duration]*segment_number,
+                              pb=split_duration*segment_number, best_splits=[split_duration/2]*segment_number)
+    splitter = Splitter(segment_names.copy(), clock=clock)
+    view = SegmentsView(segment_names.copy(), lambda: splitter, lambda: records)
+    view.resize(view.sizeHint())
+    view.show()
+
+    splitter.split()
+    for _ in range(segment_number//2):
+        clock.advance(split_duration)
+        splitter.split()
+        view.refresh(segment_changed=True, current_time=clock())
+    return view, splitter
+
+
+def run():
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    results = {}
+    for segment_number in segment_numbers:
+        clock = FakeClock()
+        view, splitter = get_view(segment_number, clock)
+
+        def tick():
+            clock.advance(0.1)
+            view.refresh(current_time=clock())
+
+        def tick_and_paint():
+            tick()
+            view.repaint()
+
+        def split():
+            splitter.undo_split()
+            view.erase_current_split()
+            clock.advance(split_duration)
+            splitter.split()
+            view.refresh(segment_changed=True, current_time=clock())
+
+        results[f"rendering/refresh/unchanged time/{segment_number} segments"] = \
+                measure(lambda: view.refresh(current_time=clock()), number=1000)
+        results[f"rendering/refresh/tick/{segment_number} segments"] = measure(tick, number=1000)
+        results[f"rendering/refresh/tick and paint/{segment_number} segments"] = measure(tick_and_paint)
+        results[f"rendering/refresh/split/{segment_number} segments"] = measure(split)
+        view.close()
+        app.processEvents()
+    return results
+
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,55 @@
+from common import measure, print_results
+from pysplitter.core.splitter import Splitter, TimeInformation
+from pysplitter.core.clock import FakeClock
+
+
+segment_numbers = [10, 100, 1000]
+split_duration = 10.
+
+
+def get_run(segment_number, clock):
+    splitter = Splitter([f"segment {i}" for i in range(segment_number)], clock=clock)
+
+    def run():
+        for _ in range(segment_number+1):
+            clock.advance(split_duration)
+            splitter.split()
+        splitter.reset()
+    return run
+
+
+def get_ongoing_splitter(segment_number, clock):
+    splitter = Splitter([f"segment {i}" for i in range(segment_number)], clock=clock)
+    for _ in range(segment_number//2):
+        clock.advance(split_duration)
+        splitter.split()
+    clock.advance(split_duration/3)
+    return splitter
+
+
+def run():
+    results = {}
+    for segment_number in segment_numbers:
+        clock = FakeClock()
+        results[f"splitter/split/{segment_number} segments"] = \
+                measure(get_run(segment_number, clock), number=10)/(segment_number+1)
+
+        splitter = get_ongoing_splitter(segment_number, clock)
+        for time_information in TimeInformation:
+            results[f"splitter/get_time/{time_information.name.lower()}/{segment_number} segments"] = \
+                    measure(lambda: splitter.get_time(time_information), number=10_000)
+        results[f"splitter/get_time_until_display_change/{segment_number} segments"] = \
+                measure(lambda: splitter.get_time_until_display_change(1), number=10_000)
+
+        # Cache invalidated by every split
+        def split_and_get_all_segments():
+            splitter.undo_split()
+            splitter.split()
+            splitter.get_time(TimeInformation.ALL_SEGMENTS)
+        results[f"splitter/get_time/all_segments after split/{segment_number} segments"] = \
+                measure(split_and_get_all_segments, number=100)
+    return results
+
+
+if __name__ == "__main__":
+    print_results(run())
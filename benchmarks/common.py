@@ -0,0 +1,35 @@
+import os
+import sys
+import platform
+import subprocess
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+
+# Best time per call in seconds: the minimum is the least disturbed by the rest of the system
+def measure(function, number=100, repeat=5):
+    return min(timeit.repeat(function, number=number, repeat=repeat))/number
+
+
+def get_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_environment():
+    return {
+            "commit": get_commit(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "system": platform.system(),
+        }
+
+
+def print_results(results):
+    for name, duration in results.items():
+        print(f"{name:<60} {duration*1e6:12.2f} µs")
@@ -0,0 +1,63 @@
+import sys
+import json
+import argparse
+import importlib
+import warnings
+
+from common import get_environment, print_results
+
+
+# Runs the benchmarks and writes their results (best time per call, in
+# seconds) as JSON, to compare commits:
+#   python benchmarks/run_benchmarks.py -o before.json
+#   python benchmarks/run_benchmarks.py -o after.json --compare before.json
+suites = ["splitter", "records", "recovery", "database", "rendering", "density"]
+
+
+def run_suites(suite_names):
+    results = {}
+    for suite_name in suite_names:
+        try:
+            suite = importlib.import_module(f"bench_{suite_name}")
+        except ImportError as error:
+            warnings.warn(f'Benchmarks "{suite_name}" skipped: {error}.')
+            continue
+        print(f"Running {suite_name} benchmarks...", file=sys.stderr)
+        results.update(suite.run())
+    return results
+
+
+def print_comparison(results, reference_results):
+    for name, duration in results.items():
+        if name in reference_results:
+            print(f"{name:<60} {duration*1e6:12.2f} µs {duration/reference_results[name]:7.2f}x")
+        else:
+            print(f"{name:<60} {duration*1e6:12.2f} µs      new")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs the PySplitter benchmarks.")
+    parser.add_argument(metavar="suites", dest="suite_names", nargs="*", default=suites,
+                        help=f"Benchmarks to run among {', '.join(suites)}. All by default.")
+    parser.add_argument("-o", metavar="output file", dest="output_file", help="JSON file where results are written")
+    parser.add_argument("--compare", metavar="reference file", dest="reference_file",
+                        help="JSON results of a previous run, printed as time ratios")
+    args = parser.parse_args(sys.argv[1:])
+    for suite_name in args.suite_names:
+        if suite_name not in suites:
+            parser.error(f'Unknown benchmarks "{suite_name}". Available: {", ".join(suites)}.')
+
+    reference_results = None
+    if args.reference_file is not None:
+        with open(args.reference_file) as file_stream:
+            reference_results = json.load(file_stream)["results"]
+
+    results = run_suites(args.suite_names)
+    if reference_results is not None:
+        print_comparison(results, reference_results)
+    else:
+        print_results(results)
+
+    if args.output_file is not None:
+        with open(args.output_file, "w") as file_stream:
+            json.dump({"environment": get_environment(), "results": results}, file_stream, indent=4)
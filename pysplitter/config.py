@@ -14,23 +14,50 @@ keymaps = {
         "quit":         Qt.Key.Key_Q,
     }
 
+# Race mode: split keys of the runners, in order. Input backends can also emit
+# "split <runner>" and "undo <runner>" actions, runners being numbered from 0.
+race_keymaps = {
+        "start": Qt.Key.Key_Space,
+        "reset": Qt.Key.Key_R,
+        "quit":  Qt.Key.Key_Q,
+    }
+race_split_keys = [Qt.Key.Key_1, Qt.Key.Key_2, Qt.Key.Key_3, Qt.Key.Key_4, Qt.Key.Key_5,
+                   Qt.Key.Key_6, Qt.Key.Key_7, Qt.Key.Key_8, Qt.Key.Key_9, Qt.Key.Key_0]
+race_visible_segments = 4
+race_show_predictions = False
+
+# Global hotkeys read on a dedicated thread, used along with the window keymaps
+input_backend = None  # None or "evdev"
+evdev_device = "/dev/input/event0"
+evdev_keymap = {
+        "KEY_SPACE": "split",
+        "KEY_BACKSPACE": "undo",
+    }
+
 database_directory = os.path.join(absolute_path_to_file, "database")
+database_backend = "json"  # "json" or "sqlite"
 
 timer_precision = 1  # in decimals
-refresh_delay = 0.05  # in seconds, should be smaller than timer precision for correct rendering
+refresh_delay = 0.05  # in seconds, minimum delay between refreshes when timer precision is finer
+max_visible_segments = 20  # more segments are scrolled
+show_run_predictions = True  # predicted time, sum of best and possible time save rows
 use_database = True
 ask_update_database = False
+latency_histogram_file = None  # if set, split input latencies are written there on exit
+recovery_file = os.path.join(database_directory, "recovery.ring")  # None to disable crash recovery
+state_server_address = None  # e.g. "127.0.0.1:7788" or a Unix socket path, pushes run events to local clients
 
-# CSS format: e.g. "rgb(R, G, B)", "color name"
+# e.g. "#RRGGBB", SVG color name
 best_split_color = "gold"
 odd_row_text_color = "#384459"
 odd_row_bg_color ="#b2c0d6"
 even_row_text_color = "#e8effa"
 even_row_bg_color = "#556787"
 
-# Can be any color name supported by matplotlib
+# Can be any color name supported by Qt: e.g. "#RRGGBB", SVG color name
 time_loss_color = "#991111"
 time_gain_color = "#08C421"
 # Delta gradient range
 worst_time_loss = 30 # in seconds
 best_time_gain = 30 # in seconds
+color_bins = 60
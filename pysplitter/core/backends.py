@@ -0,0 +1,13 @@
+from pysplitter.core import database, sqlite_database
+
+
+# Modules storing the history of the runs, selected by name in the config.
+# They provide update_database, load_database, database_exists,
+# get_database_files and get_speedrun_names.
+database_backends = {"json": database, "sqlite": sqlite_database}
+
+
+def get_database_backend(name):
+    if name not in database_backends:
+        raise ValueError(f'Database backend "{name}" invalid. Available backends: {", ".join(database_backends)}.')
+    return database_backends[name]
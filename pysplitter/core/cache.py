@@ -0,0 +1,38 @@
+import os
+import json
+import shutil
+import hashlib
+
+
+# Results computed from a speedrun's history are cached in "<name>.cache/", one
+# file per key. A key is the hash of the identity (name, size, modification
+# time) of the files the results are computed from and of the options used, so
+# any change of these files or options misses the cache.
+
+
+def get_cache_dir(database_dir, speedrun_name):
+    return os.path.join(database_dir, speedrun_name+".cache")
+
+
+def _get_file_identities(file_names):
+    for file_name in file_names:
+        if os.path.isdir(file_name):
+            yield from _get_file_identities(sorted(os.path.join(file_name, entry) for entry in os.listdir(file_name)))
+        elif os.path.isfile(file_name):
+            file_status = os.stat(file_name)
+            yield [os.path.basename(file_name), file_status.st_size, file_status.st_mtime_ns]
+
+
+def get_cache_key(file_names, options):
+    identity = json.dumps({"files": list(_get_file_identities(file_names)), "options": options}, sort_keys=True)
+    return hashlib.sha256(identity.encode()).hexdigest()
+
+
+def get_cache_file_name(database_dir, speedrun_name, key, extension=""):
+    return os.path.join(get_cache_dir(database_dir, speedrun_name), key+extension)
+
+
+def invalidate_cache(database_dir, speedrun_name):
+    cache_dir = get_cache_dir(database_dir, speedrun_name)
+    if os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir, ignore_errors=True)
@@ -0,0 +1,11 @@
+# Stands in for perf_counter_ns where time must be controlled, in tests and
+# benchmarks. Time only changes when advanced.
+class FakeClock:
+    def __init__(self, time: int=0):
+        self.time = time
+
+    def __call__(self)->int:
+        return self.time
+
+    def advance(self, seconds: float):
+        self.time += round(seconds*1e9)
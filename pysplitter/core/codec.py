@@ -0,0 +1,64 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# orjson's decoding error derives from json.JSONDecodeError
+DecodeError = json.JSONDecodeError
+
+
+class StdlibCodec:
+    name = "json"
+
+    @staticmethod
+    def loads(content):
+        return json.loads(content)
+
+    @staticmethod
+    def dumps(content, indent=False)->str:
+        # Same layout as orjson's, so that files don't depend on the codec
+        if indent:
+            return json.dumps(content, indent=2, ensure_ascii=False)
+        return json.dumps(content, separators=(",", ":"), ensure_ascii=False)
+
+
+class OrjsonCodec:
+    name = "orjson"
+
+    @staticmethod
+    def loads(content):
+        return orjson.loads(content)
+
+    @staticmethod
+    def dumps(content, indent=False)->str:
+        return orjson.dumps(content, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+
+
+codecs = {StdlibCodec.name: StdlibCodec}
+if orjson is not None:
+    codecs[OrjsonCodec.name] = OrjsonCodec
+
+codec = OrjsonCodec if orjson is not None else StdlibCodec
+
+
+def set_codec(name):
+    global codec
+    if name not in codecs:
+        raise ValueError(f'JSON codec "{name}" unavailable. Available codecs: {", ".join(codecs)}.')
+    codec = codecs[name]
+
+
+def loads(content):
+    return codec.loads(content)
+
+
+def dumps(content, indent=False)->str:
+    return codec.dumps(content, indent)
+
+
+def load_file(file_name):
+    with open(file_name, "rb") as file_stream:
+        return codec.loads(file_stream.read())
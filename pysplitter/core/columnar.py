@@ -0,0 +1,154 @@
+import os
+import json
+import math
+import struct
+import time
+
+
+# One file per column, one little-endian 8-byte value per attempt. Files can be
+# opened directly with numpy.memmap(file_name, dtype=column_dtypes[...]).
+column_dtypes = {"time": "<f8", "timestamp": "<i8"}
+_column_formats = {"time": "<d", "timestamp": "<q"}
+_value_size = 8
+
+_index_file = "columns.json"
+_final_time_file = "final_time.f64"
+_timestamp_file = "timestamp.i64"
+unknown_timestamp = 0
+
+
+def get_store_dir(database_dir, speedrun_name):
+    return os.path.join(database_dir, speedrun_name+".columns")
+
+
+def store_exists(database_dir, speedrun_name):
+    return os.path.isfile(os.path.join(get_store_dir(database_dir, speedrun_name), _index_file))
+
+
+def _load_index(store_dir):
+    index_file_name = os.path.join(store_dir, _index_file)
+    if not os.path.isfile(index_file_name):
+        return []
+
+    with open(index_file_name, "r") as file_stream:
+        return json.load(file_stream)["columns"]
+
+
+def _write_index(store_dir, segment_names):
+    index_file_name = os.path.join(store_dir, _index_file)
+    with open(index_file_name+".tmp", "w") as file_stream:
+        json.dump({"columns": segment_names}, file_stream)
+    os.replace(index_file_name+".tmp", index_file_name)
+
+
+def _get_segment_file(column_index):
+    return f"segment_{column_index}.f64"
+
+
+def get_row_count(store_dir):
+    timestamp_file_name = os.path.join(store_dir, _timestamp_file)
+    if not os.path.isfile(timestamp_file_name):
+        return 0
+    return os.path.getsize(timestamp_file_name)//_value_size
+
+
+def _write_values(file_name, row, values, column_type="time"):
+    # Writing at the committed row count and truncating repairs columns left
+    # longer than the others by an interrupted append.
+    data = b"".join(struct.pack(_column_formats[column_type], value) for value in values)
+    with open(file_name, "r+b" if os.path.isfile(file_name) else "wb") as file_stream:
+        file_stream.seek(row*_value_size)
+        file_stream.write(data)
+        file_stream.truncate()
+
+
+def _to_column_value(value):
+    return math.nan if value is None else value
+
+
+def append_runs(database_dir, speedrun_name, runs):
+    store_dir = get_store_dir(database_dir, speedrun_name)
+    os.makedirs(store_dir, exist_ok=True)
+
+    runs = list(runs)
+    if not runs:
+        return
+
+    segment_names = _load_index(store_dir)
+    row_count = get_row_count(store_dir)
+
+    new_segment_names = [segment for segment_times, *_ in runs for segment in segment_times
+                            if segment not in segment_names]
+    for segment in dict.fromkeys(new_segment_names):
+        segment_names.append(segment)
+        _write_values(os.path.join(store_dir, _get_segment_file(len(segment_names)-1)),
+                      0, [math.nan]*row_count)
+    _write_index(store_dir, segment_names)
+
+    for column_index, segment in enumerate(segment_names):
+        _write_values(os.path.join(store_dir, _get_segment_file(column_index)), row_count,
+                      [_to_column_value(segment_times.get(segment)) for segment_times, *_ in runs])
+
+    _write_values(os.path.join(store_dir, _final_time_file), row_count,
+                  [_to_column_value(final_time) for _, final_time, *_ in runs])
+
+    # The timestamp column is written last: its length defines the committed row count.
+    _write_values(os.path.join(store_dir, _timestamp_file), row_count,
+                  [run[2] if len(run) > 2 else unknown_timestamp for run in runs], "timestamp")
+
+
+def append_run(database_dir, speedrun_name, segment_times, final_time=None, timestamp=None):
+    timestamp = time.time_ns() if timestamp is None else timestamp
+    append_runs(database_dir, speedrun_name, [(segment_times, final_time, timestamp)])
+
+
+def rebuild_store(database_dir, speedrun_name, runs):
+    store_dir = get_store_dir(database_dir, speedrun_name)
+    os.makedirs(store_dir, exist_ok=True)
+    for file_name in os.listdir(store_dir):
+        os.remove(os.path.join(store_dir, file_name))
+
+    _write_index(store_dir, [])
+    append_runs(database_dir, speedrun_name,
+                [(segment_times, final_time, unknown_timestamp) for segment_times, final_time in runs])
+
+
+def get_column_files(database_dir, speedrun_name):
+    store_dir = get_store_dir(database_dir, speedrun_name)
+    return ([("__timestamp", os.path.join(store_dir, _timestamp_file), "timestamp"),
+             ("__final_time", os.path.join(store_dir, _final_time_file), "time")]
+            + [(segment, os.path.join(store_dir, _get_segment_file(column_index)), "time")
+                    for column_index, segment in enumerate(_load_index(store_dir))])
+
+
+# Yields the raw little-endian values of the committed rows, chunk_size rows at a time.
+def read_column_chunks(file_name, row_count, chunk_size):
+    with open(file_name, "rb") as file_stream:
+        for chunk_start in range(0, row_count, chunk_size):
+            yield file_stream.read(min(chunk_size, row_count-chunk_start)*_value_size)
+
+
+def decode_values(data, column_type="time"):
+    return struct.unpack(f"<{len(data)//_value_size}{_column_formats[column_type][-1]}", data)
+
+
+def load_columns(database_dir, speedrun_name, mmap_mode="r"):
+    import numpy as np
+
+    store_dir = get_store_dir(database_dir, speedrun_name)
+    if not store_exists(database_dir, speedrun_name):
+        return {}
+
+    row_count = get_row_count(store_dir)
+
+    def open_column(file_name, column_type="time"):
+        dtype = column_dtypes[column_type]
+        if row_count == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(store_dir, file_name), dtype=dtype, mode=mmap_mode, shape=(row_count,))
+
+    columns = {segment: open_column(_get_segment_file(column_index))
+                    for column_index, segment in enumerate(_load_index(store_dir))}
+    columns["__final_time"] = open_column(_final_time_file)
+    columns["__timestamp"] = open_column(_timestamp_file, "timestamp")
+    return columns
@@ -1,7 +1,16 @@
 import os
-import json
+import glob
+import time
 import warnings
 
+from pysplitter.core import cache, codec, columnar, summary, sketch
+from pysplitter.core.persistence import write_file_atomically
+
+
+# The journal is folded into the snapshot once it grows larger than the snapshot
+# itself, which keeps the amortized cost of an append constant.
+minimum_compaction_size = 64*1024  # in bytes
+
 
 def _create_or_append_time_to_database(database, segment_name, time):
     if database.get(segment_name) is None:
@@ -14,30 +23,156 @@ def _append_times_to_database(database, segment_times, final_time=None):
     for segment, time in segment_times.items():
         _create_or_append_time_to_database(database, segment, time)
 
-    if final_time is not None:
-        _create_or_append_time_to_database(database, "__final_time", final_time)
+    _create_or_append_time_to_database(database, "__final_time", final_time)
+
+
+def _get_snapshot_file_name(database_dir, speedrun_name):
+    return os.path.join(database_dir, speedrun_name+".json")
+
+
+def _get_journal_file_name(database_dir, speedrun_name):
+    return os.path.join(database_dir, speedrun_name+".journal")
 
 
 def _load_database(file_name):
     if not os.path.isfile(file_name):
         return {}
 
-    with open(file_name, "r") as file_stream:
-        return json.load(file_stream)
+    return codec.load_file(file_name)
 
 
 def _write_database(database, file_name):
-    with open(file_name, "w") as file_stream:
-        database = json.dump(database, file_stream)
+    write_file_atomically(file_name, codec.dumps(database))
 
 
-def update_database(database_dir, speedrun_name, segment_times, final_time=None):
+def _read_journal(file_name):
+    if not os.path.isfile(file_name):
+        return
+
+    with open(file_name, "r") as file_stream:
+        for line_number, line in enumerate(file_stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                run = codec.loads(line)
+            except codec.DecodeError:
+                warnings.warn(f'Skipped corrupted run at line {line_number} of journal "{file_name}".')
+                continue
+            yield run["segment_times"], run.get("final_time")
+
+
+def _append_to_journal(file_name, runs):
+    with open(file_name, "a") as file_stream:
+        file_stream.write("".join(
+                codec.dumps({"segment_times": segment_times, "final_time": final_time}) + "\n"
+                for segment_times, final_time, *_ in runs
+            ))
+
+
+def _should_compact(snapshot_file_name, journal_file_name):
+    journal_size = os.path.getsize(journal_file_name) if os.path.isfile(journal_file_name) else 0
+    snapshot_size = os.path.getsize(snapshot_file_name) if os.path.isfile(snapshot_file_name) else 0
+    return journal_size >= max(minimum_compaction_size, snapshot_size)
+
+
+# Lists are aligned by position. Older databases only recorded final times for
+# some attempts, if at all; these are treated as unknown.
+def get_aligned_runs(database):
+    segment_names = [name for name in database if not name.startswith("__")]
+    run_count = max((len(database[name]) for name in segment_names), default=0)
+
+    final_times = database.get("__final_time", [])
+    if len(final_times) != run_count:
+        final_times = [None]*run_count
+
+    def get_time(segment, run):
+        times = database[segment]
+        return times[run] if run < len(times) else None
+
+    for run in range(run_count):
+        yield {segment: get_time(segment, run) for segment in segment_names}, final_times[run]
+
+
+def database_exists(database_dir, speedrun_name):
+    return (os.path.isfile(_get_snapshot_file_name(database_dir, speedrun_name))
+            or os.path.isfile(_get_journal_file_name(database_dir, speedrun_name))
+            or columnar.store_exists(database_dir, speedrun_name))
+
+
+# Files whose content determines the results computed from the history
+def get_database_files(database_dir, speedrun_name):
+    return [
+            _get_snapshot_file_name(database_dir, speedrun_name),
+            _get_journal_file_name(database_dir, speedrun_name),
+            columnar.get_store_dir(database_dir, speedrun_name),
+            summary.get_summary_file_name(database_dir, speedrun_name),
+        ]
+
+
+def get_speedrun_names(database_dir):
+    file_names = (glob.glob(os.path.join(database_dir, "*.json")) + glob.glob(os.path.join(database_dir, "*.journal"))
+                    + glob.glob(os.path.join(database_dir, "*.columns")))
+    return sorted({os.path.splitext(os.path.basename(file_name))[0] for file_name in file_names})
+
+
+def load_database(database_dir, speedrun_name):
+    database = _load_database(_get_snapshot_file_name(database_dir, speedrun_name))
+    for segment_times, final_time in _read_journal(_get_journal_file_name(database_dir, speedrun_name)):
+        _append_times_to_database(database, segment_times, final_time)
+    return database
+
+
+def compact_database(database_dir, speedrun_name):
+    journal_file_name = _get_journal_file_name(database_dir, speedrun_name)
+    if not os.path.isfile(journal_file_name):
+        return
+
+    _write_database(load_database(database_dir, speedrun_name),
+                    _get_snapshot_file_name(database_dir, speedrun_name))
+    os.remove(journal_file_name)
+
+
+# Aggregates are updated incrementally, or built from the history returned by
+# load_history (which already contains the new runs) when they don't exist yet.
+def update_aggregates(database_dir, speedrun_name, runs, load_history):
+    if summary.summary_exists(database_dir, speedrun_name):
+        summary.update_summary(database_dir, speedrun_name, runs)
+    else:
+        summary.write_summary(database_dir, speedrun_name, summary.build_summary(load_history(database_dir, speedrun_name)))
+
+    if sketch.sketches_exist(database_dir, speedrun_name):
+        sketch.update_sketches(database_dir, speedrun_name, runs)
+    else:
+        sketch.write_sketches(database_dir, speedrun_name, sketch.build_sketches(load_history(database_dir, speedrun_name)))
+
+
+# Runs are (segment_times, final_time, timestamp) tuples. Each file is opened
+# once per batch instead of once per run.
+def append_runs_to_database(database_dir, speedrun_name, runs):
     if not os.path.isdir(database_dir):
         warnings.warn(f'Could not update database. Database directory "{database_dir}" does not exist.')
         return
 
-    file_name = os.path.join(database_dir, speedrun_name+".json")
+    runs = list(runs)
+    if not runs:
+        return
+
+    cache.invalidate_cache(database_dir, speedrun_name)
+
+    # Built from the previous history, so that the timestamps of the new runs are kept
+    if not columnar.store_exists(database_dir, speedrun_name):
+        columnar.rebuild_store(database_dir, speedrun_name, get_aligned_runs(load_database(database_dir, speedrun_name)))
 
-    database = _load_database(file_name)
-    _append_times_to_database(database, segment_times, final_time)
-    _write_database(database, file_name)
+    journal_file_name = _get_journal_file_name(database_dir, speedrun_name)
+    _append_to_journal(journal_file_name, runs)
+
+    if _should_compact(_get_snapshot_file_name(database_dir, speedrun_name), journal_file_name):
+        compact_database(database_dir, speedrun_name)
+
+    columnar.append_runs(database_dir, speedrun_name, runs)
+
+    update_aggregates(database_dir, speedrun_name, runs, load_database)
+
+
+def update_database(database_dir, speedrun_name, segment_times, final_time=None):
+    append_runs_to_database(database_dir, speedrun_name, [(segment_times, final_time, time.time_ns())])
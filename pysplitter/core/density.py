@@ -0,0 +1,63 @@
+import numpy as np
+
+
+# Gaussian kernel density estimates of every segment at once. Samples are
+# linearly binned on a regular grid per segment, then all grids are convolved
+# with their kernel in a single FFT. The bandwidth is that of
+# scipy.stats.gaussian_kde: bandwidth_factor times the sample standard deviation.
+default_grid_size = 2048
+
+
+def _bin_samples(samples, lower_bounds, spacings, grid_size):
+    segment_indices = np.repeat(np.arange(len(samples)), [len(segment_samples) for segment_samples in samples])
+    positions = (np.concatenate(samples) - lower_bounds[segment_indices]) / spacings[segment_indices]
+
+    bins = np.clip(np.floor(positions).astype(np.int64), 0, grid_size-2)
+    upper_weights = np.clip(positions - bins, 0, 1)
+    flat_bins = segment_indices*grid_size + bins
+
+    counts = np.bincount(flat_bins, weights=1-upper_weights, minlength=len(samples)*grid_size)
+    counts += np.bincount(flat_bins+1, weights=upper_weights, minlength=len(samples)*grid_size)
+    return counts.reshape(len(samples), grid_size)
+
+
+def estimate_densities(samples, bandwidth_factor=0.5, point_number=300, grid_size=default_grid_size):
+    # samples: one array per segment, without missing values. Returns the
+    # evaluation points (point_number from each segment's min to max) and the
+    # densities, as (segment number, point_number) arrays. Segments with fewer
+    # than 2 distinct samples have no density: their values are NaN.
+    samples = [np.asarray(segment_samples, dtype=float) for segment_samples in samples]
+    if not samples:
+        return np.empty((0, point_number)), np.empty((0, point_number))
+
+    sample_numbers = np.array([len(segment_samples) for segment_samples in samples])
+    lower_bounds = np.array([segment_samples.min() if len(segment_samples) else np.nan for segment_samples in samples])
+    upper_bounds = np.array([segment_samples.max() if len(segment_samples) else np.nan for segment_samples in samples])
+    bandwidths = bandwidth_factor*np.array([segment_samples.std(ddof=1) if len(segment_samples) > 1 else 0.
+                                                for segment_samples in samples])
+
+    valid = (sample_numbers > 1) & (bandwidths > 0)
+    spacings = np.where(valid, (upper_bounds-lower_bounds)/(grid_size-1), 1.)
+    bandwidths = np.where(valid, bandwidths, 1.)
+
+    counts = _bin_samples([segment_samples if is_valid else segment_samples[:0]
+                                for segment_samples, is_valid in zip(samples, valid)],
+                          np.where(valid, lower_bounds, 0.), spacings, grid_size)
+
+    # Zero-padding to twice the grid size avoids wrapping around
+    offsets = np.fft.fftfreq(2*grid_size, 1/(2*grid_size))
+    kernels = np.exp(-0.5*(offsets[None, :]*(spacings/bandwidths)[:, None])**2)
+    grid_densities = np.fft.irfft(np.fft.rfft(counts, 2*grid_size) * np.fft.rfft(kernels), 2*grid_size)[:, :grid_size]
+    grid_densities /= (np.sqrt(2*np.pi)*bandwidths*np.maximum(sample_numbers, 1))[:, None]
+
+    # Evaluation points are at the same fractional grid positions for every segment
+    positions = np.linspace(0, grid_size-1, point_number)
+    lower_bins = np.minimum(positions.astype(np.int64), grid_size-2)
+    fractions = positions - lower_bins
+    densities = grid_densities[:, lower_bins]*(1-fractions) + grid_densities[:, lower_bins+1]*fractions
+    densities = np.maximum(densities, 0)  # FFT rounding errors
+
+    points = lower_bounds[:, None] + positions[None, :]*spacings[:, None]
+    densities[~valid] = np.nan
+    points[~valid] = lower_bounds[~valid, None]
+    return points, densities
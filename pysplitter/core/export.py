@@ -0,0 +1,98 @@
+import os
+import csv
+import sys
+import struct
+import zipfile
+import argparse
+import warnings
+
+from pysplitter.core import columnar, database
+
+
+# Histories are exported from the columnar store, chunk_size attempts at a time,
+# so memory doesn't grow with the history. NPZ members are written as raw .npy
+# files: the columns are already stored as little-endian float64/int64 values.
+default_chunk_size = 4096  # in attempts
+
+
+def _prepare_store(database_dir, speedrun_name):
+    if not columnar.store_exists(database_dir, speedrun_name):
+        columnar.rebuild_store(database_dir, speedrun_name,
+                               database.get_aligned_runs(database.load_database(database_dir, speedrun_name)))
+    return columnar.get_row_count(columnar.get_store_dir(database_dir, speedrun_name))
+
+
+def _to_csv_value(value):
+    return "" if value != value else repr(value)
+
+
+def export_csv(database_dir, speedrun_name, file_name, chunk_size=default_chunk_size):
+    row_count = _prepare_store(database_dir, speedrun_name)
+    column_files = columnar.get_column_files(database_dir, speedrun_name)
+
+    chunks = [columnar.read_column_chunks(column_file, row_count, chunk_size) for _, column_file, _ in column_files]
+    with open(file_name, "w", newline="") as file_stream:
+        writer = csv.writer(file_stream)
+        writer.writerow(["attempt", "timestamp", "final_time"] + [column for column, _, _ in column_files[2:]])
+
+        attempt = 1
+        for column_chunks in zip(*chunks):
+            timestamps, *time_columns = [columnar.decode_values(chunk, column_type)
+                                            for chunk, (_, _, column_type) in zip(column_chunks, column_files)]
+            for row, timestamp in enumerate(timestamps):
+                writer.writerow([attempt+row, "" if timestamp == columnar.unknown_timestamp else timestamp]
+                                + [_to_csv_value(times[row]) for times in time_columns])
+            attempt += len(timestamps)
+
+
+def _get_npy_header(dtype, length):
+    header = f"{{'descr': '{dtype}', 'fortran_order': False, 'shape': ({length},), }}"
+    # Magic string, version and header length take 10 bytes. The data is 64-byte aligned.
+    header += " "*(63 - (10+len(header)) % 64) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1")
+
+
+def export_npz(database_dir, speedrun_name, file_name, chunk_size=default_chunk_size):
+    row_count = _prepare_store(database_dir, speedrun_name)
+
+    with zipfile.ZipFile(file_name, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for column, column_file, column_type in columnar.get_column_files(database_dir, speedrun_name):
+            with archive.open(column+".npy", "w", force_zip64=True) as member:
+                member.write(_get_npy_header(columnar.column_dtypes[column_type], row_count))
+                for chunk in columnar.read_column_chunks(column_file, row_count, chunk_size):
+                    member.write(chunk)
+
+
+exporters = {"csv": export_csv, "npz": export_npz}
+
+
+def export_database(database_dir, output_dir, file_format="csv", speedrun_names=None, chunk_size=default_chunk_size):
+    if file_format not in exporters:
+        raise ValueError(f'Unknown export format "{file_format}". Available formats: {", ".join(exporters)}.')
+
+    if speedrun_names is None:
+        speedrun_names = database.get_speedrun_names(database_dir)
+
+    os.makedirs(output_dir, exist_ok=True)
+    file_names = []
+    for speedrun_name in speedrun_names:
+        if not database.database_exists(database_dir, speedrun_name):
+            warnings.warn(f'Speedrun "{speedrun_name}" skipped: no history in "{database_dir}".')
+            continue
+
+        file_name = os.path.join(output_dir, f"{speedrun_name}.{file_format}")
+        exporters[file_format](database_dir, speedrun_name, file_name, chunk_size)
+        file_names.append(file_name)
+    return file_names
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exports speedrun histories to CSV (row per attempt) or NPZ (array per segment).")
+    parser.add_argument(metavar="database directory", dest="database_dir")
+    parser.add_argument(metavar="output directory", dest="output_dir")
+    parser.add_argument("-f", metavar="format", dest="file_format", choices=list(exporters), default="csv")
+    parser.add_argument("-n", metavar="speedrun name", dest="speedrun_names", action="append",
+                        help="exported speedrun, all speedruns when omitted")
+    parser.add_argument("-c", metavar="chunk size", dest="chunk_size", type=int, default=default_chunk_size)
+    args = parser.parse_args(sys.argv[1:])
+    export_database(args.database_dir, args.output_dir, args.file_format, args.speedrun_names, args.chunk_size)
@@ -0,0 +1,126 @@
+import os
+import abc
+import select
+import threading
+import warnings
+from collections import deque, namedtuple
+from time import perf_counter_ns
+
+
+InputEvent = namedtuple("InputEvent", ["action", "timestamp"])
+
+
+class InputQueue:
+    # deque appends and pops are atomic: the input thread and the UI thread
+    # exchange events without locking. When full, new events are dropped.
+    def __init__(self, max_size=256, notify=None):
+        self._events = deque()
+        self.max_size = max_size
+        self.dropped = 0
+        self._notify = notify
+
+    def put(self, event: InputEvent):
+        if len(self._events) >= self.max_size:
+            self.dropped += 1
+            return
+        self._events.append(event)
+        if self._notify is not None:
+            self._notify()
+
+    def drain(self)->list[InputEvent]:
+        events = []
+        while True:
+            try:
+                events.append(self._events.popleft())
+            except IndexError:
+                return events
+
+    def __len__(self):
+        return len(self._events)
+
+
+def _raise_thread_priority():
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), -10)
+    except (AttributeError, OSError):
+        pass
+
+
+class InputBackend(abc.ABC):
+    def __init__(self):
+        self._queue = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    @property
+    def is_running(self)->bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, queue: InputQueue):
+        self._queue = queue
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_thread, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run_thread(self):
+        _raise_thread_priority()
+        self._run()
+
+    @abc.abstractmethod
+    def _run(self):
+        pass
+
+    def _emit(self, action, timestamp=None):
+        self._queue.put(InputEvent(action, perf_counter_ns() if timestamp is None else timestamp))
+
+
+class SyntheticInputBackend(InputBackend):
+    # Emits the given (delay in seconds, action) pairs, for tests and benchmarks.
+    def __init__(self, events):
+        super().__init__()
+        self._events = list(events)
+
+    def _run(self):
+        for delay, action in self._events:
+            if self._stop_event.wait(delay):
+                return
+            self._emit(action)
+
+
+class EvdevInputBackend(InputBackend):
+    # Global hotkeys read from a Linux input device, e.g. "/dev/input/event0".
+    # The keymap associates evdev key names ("KEY_SPACE") to actions.
+    def __init__(self, device_path, keymap):
+        super().__init__()
+        try:
+            import evdev
+        except ImportError:
+            raise ImportError("The evdev input backend requires the \"evdev\" package.")
+
+        self._evdev = evdev
+        self._device = evdev.InputDevice(device_path)
+        self._keymap = {evdev.ecodes.ecodes[key]: action for key, action in keymap.items()}
+
+    def _run(self):
+        key_down = self._evdev.events.KeyEvent.key_down
+        while not self._stop_event.is_set():
+            readable, _, _ = select.select([self._device.fd], [], [], 0.1)
+            if not readable:
+                continue
+
+            timestamp = perf_counter_ns()
+            try:
+                events = list(self._device.read())
+            except OSError:
+                warnings.warn("Input device disconnected.")
+                return
+
+            for event in events:
+                if event.type == self._evdev.ecodes.EV_KEY and event.value == key_down and event.code in self._keymap:
+                    self._emit(self._keymap[event.code], timestamp)
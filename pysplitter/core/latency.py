@@ -0,0 +1,66 @@
+import json
+
+
+class LatencyHistogram:
+    # Bucket i counts latencies below 2**i µs, the last bucket everything above.
+    bucket_number = 24
+
+    def __init__(self):
+        self.counts = [0]*(self.bucket_number+1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, latency: int):
+        latency = max(latency, 0)
+        self.counts[min((latency//1000).bit_length(), self.bucket_number)] += 1
+        self.count += 1
+        self.total += latency
+        self.min = latency if self.min is None else min(self.min, latency)
+        self.max = latency if self.max is None else max(self.max, latency)
+
+    def get_bucket_limits(self)->list[int]:
+        return [1000*2**i for i in range(self.bucket_number)] + [None]
+
+    def get_mean(self)->float|None:
+        return self.total/self.count if self.count else None
+
+    def get_percentile(self, percentile: float)->int|None:
+        if not self.count:
+            return None
+
+        target, cumulative_count = percentile*self.count, 0
+        for limit, count in zip(self.get_bucket_limits(), self.counts):
+            cumulative_count += count
+            if cumulative_count >= target and count:
+                return self.max if limit is None else min(limit, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+                "unit": "ns",
+                "count": self.count,
+                "min": self.min,
+                "max": self.max,
+                "mean": self.get_mean(),
+                "p50": self.get_percentile(0.5),
+                "p99": self.get_percentile(0.99),
+                "buckets": [{"below": limit, "count": count}
+                                for limit, count in zip(self.get_bucket_limits(), self.counts) if count],
+            }
+
+    def write_to_file(self, file_name):
+        with open(file_name, "w") as file_stream:
+            json.dump(self.to_dict(), file_stream, indent=4)
+
+    def __str__(self):
+        if not self.count:
+            return "No latency recorded."
+
+        lines = [f"{self.count} splits, mean {self.get_mean()/1e3:.1f} µs, max {self.max/1e3:.1f} µs"]
+        for limit, count in zip(self.get_bucket_limits(), self.counts):
+            if count:
+                label = f"< {limit/1e3:g} µs" if limit is not None else "larger"
+                lines.append(f"{label:>14}: {count}")
+        return "\n".join(lines)
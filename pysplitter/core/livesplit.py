@@ -0,0 +1,173 @@
+import os
+import re
+import math
+import sys
+import argparse
+import warnings
+from array import array
+from datetime import datetime, timezone
+from itertools import islice
+from xml.etree import ElementTree
+
+from pysplitter.core import columnar, database
+from pysplitter.core.records import SpeedrunRecords
+
+
+# Imports LiveSplit splits (.lss). The file is parsed incrementally in a single
+# pass and parsed elements are cleared, so the XML tree is never held in memory.
+# LiveSplit stores the history segment by segment while the database stores it
+# run by run: the history is kept as one float64 array per segment (NaN when
+# missing), then appended to the database in batches of runs.
+
+_time_pattern = re.compile(r"^(-)?(?:(\d+)\.)?(\d+):(\d+):(\d+(?:\.\d*)?)$")
+_timestamp_format = "%m/%d/%Y %H:%M:%S"
+
+
+def parse_time(text):
+    if text is None:
+        return None
+
+    match = _time_pattern.match(text.strip())
+    if match is None:
+        warnings.warn(f'Invalid LiveSplit time "{text}" ignored.')
+        return None
+
+    sign, days, hours, minutes, seconds = match.groups()
+    time = ((int(days or 0)*24 + int(hours))*60 + int(minutes))*60 + float(seconds)
+    return -time if sign else time
+
+
+def _parse_timestamp(text):
+    if text is None:
+        return columnar.unknown_timestamp
+    try:
+        timestamp = datetime.strptime(text, _timestamp_format).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return columnar.unknown_timestamp
+    return int(timestamp.timestamp())*1_000_000_000
+
+
+def _get_time(element, timing_method):
+    return parse_time(element.findtext(timing_method)) if element is not None else None
+
+
+def _get_unique_names(names):
+    unique_names = []
+    for name in names:
+        unique_name, copy = name, 1
+        while unique_name in unique_names:
+            copy += 1
+            unique_name = f"{name} ({copy})"
+        unique_names.append(unique_name)
+    return unique_names
+
+
+# LiveSplit writes the attempt history before the segments, which is assumed here.
+def read_splits_file(file_name, timing_method="RealTime"):
+    information = {"game": "", "category": "", "attempt_count": 0, "attempts": [], "segments": [], "history": []}
+    attempt_rows = {}
+    segment_history = None
+
+    for _, element in ElementTree.iterparse(file_name):
+        tag = element.tag
+        if tag == "Time":
+            if segment_history is None:
+                segment_history = array("d", [math.nan])*len(information["attempts"])
+            row = attempt_rows.get(int(element.get("id")))
+            segment_time = _get_time(element, timing_method)
+            if row is not None and segment_time is not None:
+                segment_history[row] = segment_time
+            element.clear()
+
+        elif tag == "Attempt":
+            attempt_rows[int(element.get("id"))] = len(information["attempts"])
+            information["attempts"].append((_get_time(element, timing_method), _parse_timestamp(element.get("started"))))
+            element.clear()
+
+        elif tag == "Segment":
+            personal_best = None
+            for split_time in element.iterfind("SplitTimes/SplitTime"):
+                if split_time.get("name") == "Personal Best":
+                    personal_best = _get_time(split_time, timing_method)
+            information["segments"].append((
+                    (element.findtext("Name") or "").strip(),
+                    personal_best,
+                    _get_time(element.find("BestSegmentTime"), timing_method)
+                ))
+
+            if segment_history is None:
+                segment_history = array("d", [math.nan])*len(information["attempts"])
+            information["history"].append(segment_history)
+            segment_history = None
+            element.clear()
+
+        elif tag == "GameName":
+            information["game"] = (element.text or "").strip()
+        elif tag == "CategoryName":
+            information["category"] = (element.text or "").strip()
+        elif tag == "AttemptCount":
+            information["attempt_count"] = int(element.text or 0)
+
+    return information
+
+
+def get_records(information):
+    segment_names = _get_unique_names([name for name, _, _ in information["segments"]])
+    personal_bests = [personal_best for _, personal_best, _ in information["segments"]]
+
+    pb_splits, previous_split = [], 0.
+    for split in personal_bests:
+        pb_splits.append(None if split is None or previous_split is None else split-previous_split)
+        previous_split = split
+    pb = personal_bests[-1] if personal_bests else None
+
+    name = " - ".join(part for part in (information["game"], information["category"]) if part)
+    return SpeedrunRecords(name.replace(os.sep, "-") or "LiveSplit", segment_names,
+                           pb_splits=pb_splits if pb is not None else None, pb=pb,
+                           best_splits=[best_split for _, _, best_split in information["segments"]],
+                           run_count=information["attempt_count"])
+
+
+def _get_runs(segment_names, attempts, history):
+    for row, (final_time, timestamp) in enumerate(attempts):
+        segment_times = [times[row] for times in history]
+        if final_time is None and all(math.isnan(time) for time in segment_times):
+            continue  # Reset before the first split
+        yield ({segment: None if math.isnan(time) else time for segment, time in zip(segment_names, segment_times)},
+               final_time, timestamp)
+
+
+def import_splits(file_name, records_file_name, database_dir, batch_size=5000,
+                  timing_method="RealTime", database_module=database):
+    information = read_splits_file(file_name, timing_method)
+    if not information["segments"]:
+        warnings.warn(f'No segment found in "{file_name}". Nothing imported.')
+        return None
+
+    records = get_records(information)
+    records.write_to_file(records_file_name)
+    records.file_name = records_file_name
+
+    runs = _get_runs(records.segment_names, information["attempts"], information["history"])
+    while batch := list(islice(runs, batch_size)):
+        database_module.append_runs_to_database(database_dir, records.name, batch)
+
+    return records
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Imports LiveSplit splits and attempt history.")
+    parser.add_argument(metavar="splits file", dest="file_name")
+    parser.add_argument(metavar="records file", dest="records_file_name")
+    parser.add_argument(metavar="database directory", dest="database_dir")
+    parser.add_argument("-b", metavar="batch size", dest="batch_size", type=int, default=5000)
+    parser.add_argument("--game-time", dest="timing_method", action="store_const",
+                        const="GameTime", default="RealTime")
+    parser.add_argument("--sqlite", action="store_true")
+    args = parser.parse_args(sys.argv[1:])
+
+    database_module = database
+    if args.sqlite:
+        from pysplitter.core import sqlite_database as database_module
+    import_splits(args.file_name, args.records_file_name, args.database_dir,
+                  args.batch_size, args.timing_method, database_module)
@@ -0,0 +1,86 @@
+import os
+import queue
+import threading
+import warnings
+
+
+def write_file_atomically(file_name, content: str):
+    temporary_file_name = file_name+".tmp"
+    with open(temporary_file_name, "w") as file_stream:
+        file_stream.write(content)
+        file_stream.flush()
+        os.fsync(file_stream.fileno())
+    os.replace(temporary_file_name, file_name)
+
+
+class PersistenceWorker:
+    # Runs file writes on a background thread, in submission order. Successive
+    # writes of a file not yet written are coalesced: only the last content is written.
+    def __init__(self):
+        self._jobs = queue.Queue()
+        self._pending_writes = {}
+        self._write_callbacks = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="PersistenceWorker", daemon=True)
+        self._thread.start()
+
+    @property
+    def is_running(self)->bool:
+        return self._thread.is_alive()
+
+    def submit(self, function, *args, **kwargs):
+        if not self.is_running:
+            warnings.warn("Persistence worker stopped: job run synchronously.")
+            self._run_job(function, *args, **kwargs)
+            return
+        self._jobs.put((function, args, kwargs))
+
+    # on_written is called on the worker thread once the write is done, with
+    # None or the error when it failed. Coalesced writes share the outcome.
+    def write_file(self, file_name, content: str, on_written=None):
+        with self._lock:
+            already_pending = file_name in self._pending_writes
+            self._pending_writes[file_name] = content
+            if on_written is not None:
+                self._write_callbacks.setdefault(file_name, []).append(on_written)
+        if not already_pending:
+            self.submit(self._write_pending_file, file_name)
+
+    def flush(self):
+        if self.is_running:
+            self._jobs.join()
+
+    def stop(self):
+        if self.is_running:
+            self._jobs.put(None)
+            self._thread.join()
+
+    def _write_pending_file(self, file_name):
+        with self._lock:
+            content = self._pending_writes.pop(file_name)
+            callbacks = self._write_callbacks.pop(file_name, [])
+        try:
+            write_file_atomically(file_name, content)
+        except Exception as error:
+            for callback in callbacks:
+                callback(error)
+            raise
+        for callback in callbacks:
+            callback(None)
+
+    def _run_job(self, function, *args, **kwargs):
+        try:
+            function(*args, **kwargs)
+        except Exception as error:
+            warnings.warn(f"Background write failed: {error}")
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                self._jobs.task_done()
+                return
+
+            function, args, kwargs = job
+            self._run_job(function, *args, **kwargs)
+            self._jobs.task_done()
@@ -0,0 +1,58 @@
+from time import perf_counter_ns
+
+from pysplitter.core.splitter import Splitter, TimeInformation
+from pysplitter.core.latency import LatencyHistogram
+
+
+# Runners of a race start together and split independently. Their splitters
+# are queried with one shared clock read, so refreshing all runners costs a
+# single clock call.
+class Race:
+    def __init__(self, runner_records, latency_histogram: LatencyHistogram|None=None):
+        assert(len(runner_records)>0)
+        self.latency_histogram = latency_histogram if latency_histogram is not None else LatencyHistogram()
+        self.records = list(runner_records)
+        self.splitters = [Splitter(records.segment_names.copy(), self.latency_histogram) for records in self.records]
+
+    def __len__(self):
+        return len(self.splitters)
+
+    @property
+    def is_ready(self) -> bool:
+        return all(splitter.is_ready for splitter in self.splitters)
+
+    @property
+    def is_ongoing(self) -> bool:
+        return any(splitter.is_ongoing for splitter in self.splitters)
+
+    def start(self, timestamp: int|None=None):
+        if not self.is_ready:
+            return
+        timestamp = perf_counter_ns() if timestamp is None else timestamp
+        for splitter in self.splitters:
+            splitter.split(timestamp)
+
+    # A split before the start starts the race. Runners that reset during the
+    # race are out until the race is reset.
+    def split(self, runner: int, timestamp: int|None=None):
+        if self.is_ready:
+            self.start(timestamp)
+        elif self.splitters[runner].is_ongoing:
+            self.splitters[runner].split(timestamp)
+
+    def undo_split(self, runner: int):
+        self.splitters[runner].undo_split()
+
+    def reset(self, runner: int|None=None):
+        for splitter in self.splitters if runner is None else [self.splitters[runner]]:
+            splitter.reset()
+
+    def get_finished_runs(self):
+        return [(records, *splitter.get_time(TimeInformation.ALL_SEGMENTS))
+                    for records, splitter in zip(self.records, self.splitters) if splitter.has_run_ended]
+
+    def get_time_until_display_change(self, precision: int, current_time: int|None=None) -> float|None:
+        current_time = perf_counter_ns() if current_time is None else current_time
+        times = [time for time in (splitter.get_time_until_display_change(precision, current_time) for splitter in self.splitters)
+                    if time is not None]
+        return min(times, default=None)
@@ -1,16 +1,26 @@
+import math
 import warnings
-import json
+from array import array
+
+from pysplitter.core import codec
+from pysplitter.core.persistence import write_file_atomically
+
+
+def compile_type_checker(types):
+    value_type = types[0]
+    if len(types) == 1:
+        return lambda value: isinstance(value, value_type)
+
+    if len(types) == 2:
+        element_type = types[1]
+        return lambda value: isinstance(value, value_type) and all(isinstance(el, element_type) for el in value)
+
+    is_correct_element = compile_type_checker(types[1:])
+    return lambda value: isinstance(value, value_type) and all(is_correct_element(el) for el in value)
 
 
 def is_correct_type(value, types):
-    if not isinstance(value, types[0]):
-        return False
-    else:
-        if len(types) > 1:
-            for el in value:
-                if not is_correct_type(el, [t for t in types[1:]]):
-                    return False
-    return True
+    return compile_type_checker(types)(value)
 
 
 class InvalidRecordsError(Exception):
@@ -18,41 +28,57 @@ class InvalidRecordsError(Exception):
         self.message = message
 
 
+# Splits are float64 arrays, missing splits being NaN. They are None in the
+# records file and in the values returned by the sums.
+def to_splits(values)->array:
+    return array("d", [math.nan if value is None else value for value in values])
+
+
+def to_optional(value: float)->float|None:
+    return None if math.isnan(value) else value
+
+
 class SpeedrunRecords:
+    __slots__ = (
+            "name", "segment_names", "file_name", "pb_splits", "pb", "best_splits", "wr", "run_count",
+            "records_file_up_to_date", "_partial_sums",
+        )
     information_types = {
                 "segment_names": [list, str],
                 "pb": [float],
-                "pb_splits": [list, float],
-                "best_splits": [list, float],
+                "pb_splits": [list, (float, type(None))],
+                "best_splits": [list, (float, type(None))],
                 "wr": [float],
                 "name": [str],
                 "run_count": [int],
             }
     information_names = set(information_types.keys())
+    information_validators = {information: compile_type_checker(types) for information, types in information_types.items()}
 
     def __init__(self, name, segment_names, file_name=None, pb_splits=None, pb=None, best_splits=None, wr=None, run_count=None):
         self.name = name
         self.segment_names = segment_names
-        self.pb_splits = pb_splits
         self.pb = pb
-        self.best_splits = best_splits
         self.wr = wr
         self.run_count = run_count if run_count is not None else 0
         self.file_name = file_name
 
         self.records_file_up_to_date = True
+        # Prefix and suffix sums of the splits, computed when first needed
+        self._partial_sums = {}
 
-        if self.best_splits is None or len(self.best_splits) != len(self.segment_names):
-            self.best_splits = [None for i in range(len(self.segment_names))]
-        if self.pb_splits is None or len(self.pb_splits) != len(self.segment_names):
-            self.pb_splits = [None for i in range(len(self.segment_names))]
+        if best_splits is None or len(best_splits) != len(self.segment_names):
+            best_splits = [None for i in range(len(self.segment_names))]
+        if pb_splits is None or len(pb_splits) != len(self.segment_names):
+            pb_splits = [None for i in range(len(self.segment_names))]
+        self.best_splits = to_splits(best_splits)
+        self.pb_splits = to_splits(pb_splits)
 
     @staticmethod
     def load_from_file(file_name):
         try:
-            with open(file_name, "r") as file_stream:
-                file_content = json.load(file_stream)
-        except json.decoder.JSONDecodeError:
+            file_content = codec.load_file(file_name)
+        except codec.DecodeError:
             raise InvalidRecordsError("Invalid json file. Empty file or incorrect formatting.")
 
         SpeedrunRecords.validate_records_file_content(file_content)
@@ -78,10 +104,10 @@ class SpeedrunRecords:
         if "name" not in file_content.keys():
             raise InvalidRecordsError("Invalid records file. The \"name\" entry is missing.")
 
-        for information, expected_types in SpeedrunRecords.information_types.items():
-            if information in file_content.keys():
-                if not is_correct_type(file_content[information], expected_types):
-                    raise InvalidRecordsError(f"Invalid records file. The entry \"{information}\" is not of type {expected_types}.")
+        for information, is_correct_information_type in SpeedrunRecords.information_validators.items():
+            if information in file_content and not is_correct_information_type(file_content[information]):
+                expected_types = SpeedrunRecords.information_types[information]
+                raise InvalidRecordsError(f"Invalid records file. The entry \"{information}\" is not of type {expected_types}.")
 
         if file_content["segment_names"] == []:
             raise InvalidRecordsError("Invalid records file. The \"segment_names\" entry is empty.")
@@ -89,54 +115,106 @@ class SpeedrunRecords:
         if file_content["name"] == "":
             raise InvalidRecordsError("Invalid records file. The \"name\" entry is empty.")
 
-    def write_to_file(self, file_name):
+    def dumps(self)->str:
         available_information = {"name": self.name, "segment_names": self.segment_names}
         for information in ["pb", "pb_splits", "best_splits", "wr", "run_count"]:
-            if self.__dict__[information] is not None:
-                available_information[information] = self.__dict__[information]
+            value = getattr(self, information)
+            if isinstance(value, array):
+                value = value.tolist()
+                if math.isnan(sum(value)):  # Some splits are missing
+                    value = [to_optional(split) for split in value]
+                    if value.count(None) == len(value):
+                        continue
+            if value is not None:
+                available_information[information] = value
+
+        return codec.dumps(available_information, indent=True)
 
-        with open(file_name, "w") as file_stream:
-            json.dump(available_information, file_stream, indent=4)
+    def write_to_file(self, file_name):
+        write_file_atomically(file_name, self.dumps())
         self.records_file_up_to_date = True
 
     def has_new_records(self, segment_times, final_time):
-        new_best_splits = len(self._find_new_best_splits(segment_times.values()))>0
-        new_pb = self.pb is None or final_time < self.pb
-        return new_pb or new_best_splits
-
-    def _find_new_best_splits(self, splits):
-        def is_better_time(current_time, new_time):
-            if new_time is None:
-                return False
-            if current_time is None:
-                return True
-            return new_time < current_time
-
-        return [index for index, (current_time, new_time) in enumerate(zip(self.best_splits, splits))
-                    if is_better_time(current_time, new_time)]
+        new_best_splits, new_pb = self._find_new_records(to_splits(segment_times.values()), final_time)
+        return new_pb or len(new_best_splits)>0
+
+    # Single comparison of a run with the records. A split is a new best when
+    # it is lower than the best split, or known while the best split isn't
+    # (NaN being the only value different from itself).
+    def _find_new_records(self, splits, final_time):
+        new_best_splits = [index for index, (best_split, split) in enumerate(zip(self.best_splits, splits))
+                                if split < best_split or (best_split != best_split and split == split)]
+        new_pb = self.pb is None or (final_time is not None and final_time < self.pb)
+        return new_best_splits, new_pb
 
     def update_times(self, segment_times, final_time=None):
         if list(segment_times.keys()) != self.segment_names:
             warnings.warn("Times not updated. Segment names don't match.")
             return
 
-        self.records_file_up_to_date = self.records_file_up_to_date or self.has_new_records(segment_times, final_time)
+        splits = to_splits(segment_times.values())
+        new_best_splits, new_pb = self._find_new_records(splits, final_time)
+        self.records_file_up_to_date = self.records_file_up_to_date and not (new_pb or len(new_best_splits)>0)
 
-        splits = list(segment_times.values())
-        self._update_best_splits(splits)
-        self._update_pb(splits, final_time)
+        self._update_best_splits(splits, new_best_splits)
+        if new_pb and final_time is not None:
+            self._update_pb(splits, final_time)
         self.run_count += 1
 
-    def _update_best_splits(self, splits):
-        for better_split in self._find_new_best_splits(splits):
+    def _update_best_splits(self, splits, new_best_splits):
+        for better_split in new_best_splits:
             self.best_splits[better_split] = splits[better_split]
-
-    def _update_pb(self, splits, final_time) -> bool:
-        if final_time is None:
-            return False
-
-        if self.pb is None or final_time < self.pb:
-            self.pb = final_time
-            self.pb_splits = splits.copy()
-            return True
-        return False
+        if new_best_splits:
+            self._partial_sums.pop("best_splits", None)
+
+    def _update_pb(self, splits, final_time):
+        self.pb = final_time
+        self.pb_splits = array("d", splits)
+        self._partial_sums.pop("pb_splits", None)
+
+    # Sums including an unknown split are NaN, thus None once returned.
+    def _get_partial_sums(self, information):
+        if information not in self._partial_sums:
+            splits = getattr(self, information)
+            prefix_sums, suffix_sums = array("d", [0.]), array("d", [0.])
+            for prefix_split, suffix_split in zip(splits, reversed(splits)):
+                prefix_sums.append(prefix_sums[-1]+prefix_split)
+                suffix_sums.append(suffix_sums[-1]+suffix_split)
+            suffix_sums.reverse()
+            self._partial_sums[information] = prefix_sums, suffix_sums
+        return self._partial_sums[information]
+
+    def get_prefix_sum(self, information, segment_index)->float|None:
+        # Sum of the splits before segment_index, information being "pb_splits" or "best_splits"
+        return to_optional(self._get_partial_sums(information)[0][segment_index])
+
+    def get_suffix_sum(self, information, segment_index)->float|None:
+        # Sum of the splits from segment_index to the end
+        return to_optional(self._get_partial_sums(information)[1][segment_index])
+
+    def get_sum_of_best(self)->float|None:
+        return self.get_suffix_sum("best_splits", 0)
+
+    def get_possible_time_save(self, segment_index=0, current_split=0.)->float|None:
+        # Time that could still be saved on the pb from the current segment on
+        if segment_index >= len(self.segment_names):
+            return None
+
+        pb_split, best_split = self.pb_splits[segment_index], self.best_splits[segment_index]
+        remaining_pb = self.get_suffix_sum("pb_splits", segment_index+1)
+        remaining_best = self.get_suffix_sum("best_splits", segment_index+1)
+        if math.isnan(pb_split) or math.isnan(best_split) or remaining_pb is None or remaining_best is None:
+            return None
+        return max(0., pb_split - max(current_split, best_split)) + remaining_pb - remaining_best
+
+    def get_predicted_final_time(self, segment_index, completed_time=0., current_split=0.)->float|None:
+        # Final time if the remaining segments are done in pb time, the current
+        # segment taking at least its elapsed time
+        if segment_index >= len(self.segment_names):
+            return completed_time
+
+        pb_split = self.pb_splits[segment_index]
+        remaining_pb = self.get_suffix_sum("pb_splits", segment_index+1)
+        if math.isnan(pb_split) or remaining_pb is None:
+            return None
+        return completed_time + max(current_split, pb_split) + remaining_pb
@@ -0,0 +1,98 @@
+import os
+import json
+import mmap
+import warnings
+from array import array
+from typing import OrderedDict
+
+
+# Split timestamps of the ongoing run are stored in a memory-mapped file so
+# that they survive a crash. Recording a split is a store to the mapped page:
+# no write or fsync call, the OS flushes the page.
+class RecoveryRing:
+    magic = b"PYSPLIT1"
+    # Native int64 values: magic, split count, capacity, then the timestamps
+    _header_size = 3
+    _split_count_index = 1
+    _capacity_index = 2
+
+    def __init__(self, file_name, capacity):
+        self.file_name = file_name
+        self.capacity = capacity
+        size = 8*(self._header_size + capacity)
+
+        with open(file_name, "a+b") as file_stream:
+            file_stream.truncate(size)
+        self._file_stream = open(file_name, "r+b")
+        self._mmap = mmap.mmap(self._file_stream.fileno(), size)
+        self._mmap[:8] = self.magic
+        self._values = memoryview(self._mmap).cast("q")
+        self._values[self._split_count_index] = 0
+        self._values[self._capacity_index] = capacity
+
+    @staticmethod
+    def _get_information_file_name(file_name):
+        return file_name+".info"
+
+    def set_run_information(self, speedrun_name, segment_names):
+        with open(self._get_information_file_name(self.file_name), "w") as file_stream:
+            json.dump({"name": speedrun_name, "segment_names": segment_names}, file_stream)
+
+    def record_splits(self, timestamps):
+        split_count = len(timestamps)
+        if split_count > 0:
+            self._values[self._header_size + (split_count-1) % self.capacity] = timestamps[-1]
+        self._values[self._split_count_index] = split_count
+
+    def clear(self):
+        self._values[self._split_count_index] = 0
+
+    def close(self):
+        self._values.release()
+        self._mmap.close()
+        self._file_stream.close()
+
+    @staticmethod
+    def discard(file_name):
+        for discarded_file_name in (file_name, RecoveryRing._get_information_file_name(file_name)):
+            if os.path.isfile(discarded_file_name):
+                os.remove(discarded_file_name)
+
+    @staticmethod
+    def load_interrupted_run(file_name):
+        information_file_name = RecoveryRing._get_information_file_name(file_name)
+        if not os.path.isfile(file_name) or not os.path.isfile(information_file_name):
+            return None
+
+        with open(file_name, "rb") as file_stream:
+            content = file_stream.read()
+        if len(content) % 8:
+            return None
+
+        values = array("q", content)
+        if len(values) < RecoveryRing._header_size or values[:1].tobytes() != RecoveryRing.magic:
+            return None
+
+        split_count = values[RecoveryRing._split_count_index]
+        capacity = values[RecoveryRing._capacity_index]
+        if split_count < 2 or len(values) < RecoveryRing._header_size + capacity:
+            return None
+        if split_count > capacity:
+            warnings.warn("Interrupted run too long for the recovery file: only the last splits are recovered.")
+
+        with open(information_file_name, "r") as file_stream:
+            information = json.load(file_stream)
+
+        segment_names = information["segment_names"]
+        first_split = max(0, split_count-capacity)
+        timestamps = [values[RecoveryRing._header_size + i % capacity] for i in range(first_split, split_count)]
+
+        segment_times = OrderedDict( (name, None) for name in segment_names )
+        for index, (start, end) in enumerate(zip(timestamps, timestamps[1:]), start=first_split):
+            if index < len(segment_names):
+                segment_times[segment_names[index]] = (end-start)/1e9
+
+        final_time = None
+        if split_count == len(segment_names)+1 and first_split == 0:
+            final_time = (timestamps[-1]-timestamps[0])/1e9
+        return information["name"], segment_times, final_time
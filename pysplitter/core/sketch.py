@@ -0,0 +1,158 @@
+import os
+import json
+import math
+
+
+default_compression = 100
+buffer_size = 500
+
+
+# Merging t-digest (Dunning & Ertl) using the arcsine scale function, which keeps
+# centroids small near the tails so that extreme quantiles stay accurate.
+class TDigest:
+    def __init__(self, compression=default_compression, means=None, weights=None, min=None, max=None):
+        self.compression = compression
+        self.means = means if means is not None else []
+        self.weights = weights if weights is not None else []
+        self.min = min
+        self.max = max
+        self._buffer = []
+
+    @property
+    def count(self):
+        return sum(self.weights) + len(self._buffer)
+
+    def add(self, value):
+        if value is None:
+            return
+
+        self._buffer.append(value)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self._buffer) >= buffer_size:
+            self._compress()
+
+    def merge(self, other):
+        other._compress()
+        self._compress(other.means, other.weights)
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def _get_quantile_limit(self, quantile):
+        k = self.compression/(2*math.pi) * math.asin(2*quantile-1)
+        k = min(k+1, self.compression/4)
+        return (math.sin(k*2*math.pi/self.compression)+1)/2
+
+    def _compress(self, means=(), weights=()):
+        points = sorted(zip(self.means + self._buffer + list(means),
+                            self.weights + [1]*len(self._buffer) + list(weights)))
+        self._buffer = []
+        if not points:
+            return
+
+        total_weight = sum(weight for _, weight in points)
+        merged_weight = 0
+        self.means, self.weights = [], []
+
+        current_mean, current_weight = points[0]
+        quantile_limit = self._get_quantile_limit(0)
+        for mean, weight in points[1:]:
+            if (merged_weight + current_weight + weight)/total_weight <= quantile_limit:
+                current_weight += weight
+                current_mean += (mean-current_mean)*weight/current_weight
+            else:
+                merged_weight += current_weight
+                self.means.append(current_mean)
+                self.weights.append(current_weight)
+                quantile_limit = self._get_quantile_limit(merged_weight/total_weight)
+                current_mean, current_weight = mean, weight
+
+        self.means.append(current_mean)
+        self.weights.append(current_weight)
+
+    def quantile(self, quantile):
+        self._compress()
+        if not self.means:
+            return None
+        if quantile <= 0:
+            return self.min
+        if quantile >= 1:
+            return self.max
+
+        # Each centroid is centered on its cumulative weight; values in between
+        # are linearly interpolated, the extrema bound the first and last halves.
+        target = quantile*sum(self.weights)
+        previous_center, previous_mean = 0, self.min
+        cumulative_weight = 0
+        for mean, weight in zip(self.means, self.weights):
+            center = cumulative_weight + weight/2
+            if target < center:
+                return previous_mean + (mean-previous_mean)*(target-previous_center)/(center-previous_center)
+            previous_center, previous_mean = center, mean
+            cumulative_weight += weight
+
+        if cumulative_weight == previous_center:
+            return self.max
+        return previous_mean + (self.max-previous_mean)*(target-previous_center)/(cumulative_weight-previous_center)
+
+    def to_dict(self):
+        self._compress()
+        return {"compression": self.compression, "means": self.means, "weights": self.weights,
+                "min": self.min, "max": self.max}
+
+    @staticmethod
+    def from_dict(content):
+        return TDigest(**content)
+
+
+def _get_sketch_file_name(database_dir, speedrun_name):
+    return os.path.join(database_dir, speedrun_name+".sketch")
+
+
+def sketches_exist(database_dir, speedrun_name):
+    return os.path.isfile(_get_sketch_file_name(database_dir, speedrun_name))
+
+
+def add_times_to_sketches(sketches, segment_times, final_time=None):
+    for segment, time in segment_times.items():
+        sketches.setdefault(segment, TDigest()).add(time)
+    sketches.setdefault("__final_time", TDigest()).add(final_time)
+
+
+def build_sketches(database):
+    sketches = {}
+    for segment, times in database.items():
+        sketch = sketches[segment] = TDigest()
+        for time in times:
+            sketch.add(time)
+    return sketches
+
+
+def merge_sketches(sketches, other_sketches):
+    for segment, other_sketch in other_sketches.items():
+        sketches.setdefault(segment, TDigest(other_sketch.compression)).merge(other_sketch)
+    return sketches
+
+
+def load_sketches(database_dir, speedrun_name):
+    file_name = _get_sketch_file_name(database_dir, speedrun_name)
+    if not os.path.isfile(file_name):
+        return {}
+
+    with open(file_name, "r") as file_stream:
+        return {segment: TDigest.from_dict(content) for segment, content in json.load(file_stream).items()}
+
+
+def write_sketches(database_dir, speedrun_name, sketches):
+    file_name = _get_sketch_file_name(database_dir, speedrun_name)
+    with open(file_name+".tmp", "w") as file_stream:
+        json.dump({segment: sketch.to_dict() for segment, sketch in sketches.items()}, file_stream)
+    os.replace(file_name+".tmp", file_name)
+
+
+def update_sketches(database_dir, speedrun_name, runs):
+    sketches = load_sketches(database_dir, speedrun_name)
+    for segment_times, final_time, *_ in runs:
+        add_times_to_sketches(sketches, segment_times, final_time)
+    write_sketches(database_dir, speedrun_name, sketches)
@@ -1,7 +1,11 @@
 from typing import OrderedDict
+from array import array
 import warnings
 from time import perf_counter_ns
 from enum import Enum
+from types import MappingProxyType
+
+from pysplitter.core.latency import LatencyHistogram
 
 
 class TimeInformation(Enum):
@@ -18,53 +22,132 @@ class RunState(Enum):
 
 
 class Splitter:
-    def __init__(self, segment_names: list[str]):
+    # clock returns the current time in ns. It is replaceable (e.g. by a
+    # FakeClock) to time runs deterministically.
+    def __init__(self, segment_names: list[str], latency_histogram: LatencyHistogram|None=None, clock=perf_counter_ns):
         assert(len(segment_names)>0)
         self._segment_names = segment_names
-        self._segment_times = []
+        self._clock = clock
+        self.latency_histogram = latency_histogram if latency_histogram is not None else LatencyHistogram()
+        # Split timestamps in ns and completed segment durations in s, preallocated
+        # for a full run. Only the first _split_count timestamps are valid.
+        self._segment_times = array("q", bytes(8*(len(segment_names)+1)))
+        self._segment_durations = array("d", bytes(8*len(segment_names)))
+        self._split_count = 0
         self._final_time = None
         self._run_state = RunState.READY
-
-    def split(self):
+        self._version = 0
+        self._all_segments = None
+        self._all_segments_version = None
+        self._listeners = []
+
+    # The timestamp (from perf_counter_ns) should be captured as early as possible
+    # when the input is received, the current time is used otherwise.
+    def split(self, timestamp: int|None=None):
         if self.is_ready:
-            self._start()
+            self._start(timestamp)
 
         elif self.is_ongoing:
-            self._add_split_time()
-            if len(self._segment_times) == len(self._segment_names)+1:
+            self._add_split_time(timestamp)
+            self._notify("split")
+            if self._split_count == len(self._segment_names)+1:
                 self._end()
 
     def reset(self):
-        self._segment_times = []
+        self._split_count = 0
         self._final_time = None
         self._run_state = RunState.READY
+        self._version += 1
+        self._notify("reset")
 
     def undo_split(self):
-        if len(self._segment_times)>1:
-            self._segment_times.pop()
+        if self._split_count>1:
+            self._split_count -= 1
+            self._version += 1
+            self._notify("undo")
+
+    # Listeners are called with the splitter and the event ("start", "split",
+    # "undo", "reset" or "end") after the state changed, on the splitting thread.
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def _notify(self, event):
+        for listener in self._listeners:
+            listener(self, event)
 
     def get_current_segment_index(self)->int:
-        return len(self._segment_times)-1
+        return self._split_count-1
 
-    def get_time(self, time_information: TimeInformation):
-        if self._segment_times == []:
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def get_split_timestamps(self) -> memoryview:
+        return memoryview(self._segment_times)[:self._split_count].toreadonly()
+
+    def get_segment_durations(self) -> memoryview:
+        return memoryview(self._segment_durations)[:max(self._split_count-1, 0)].toreadonly()
+
+    # current_time (from perf_counter_ns) lets callers share one clock read.
+    def get_time(self, time_information: TimeInformation, current_time: int|None=None):
+        if self._split_count == 0:
             return None
 
-        current_time = self._segment_times[-1] if self.has_run_ended else perf_counter_ns()
+        last_split_time = self._segment_times[self._split_count-1]
+        if self.has_run_ended:
+            current_time = last_split_time
+        elif current_time is None:
+            current_time = self._clock()
 
         match time_information:
             case TimeInformation.CURRENT_SEGMENT:
-                return self._convert_time(current_time - self._segment_times[-1])
+                return self._convert_time(current_time - last_split_time)
             case TimeInformation.CURRENT_TOTAL_TIME:
                 return self._convert_time(current_time - self._segment_times[0])
             case TimeInformation.PREVIOUS_SEGMENT:
-                return self._convert_time(self._segment_times[-1] - self._segment_times[-2])
+                if self._split_count < 2:
+                    return None
+                return self._segment_durations[self._split_count-2]
             case TimeInformation.ALL_SEGMENTS:
-                segment_times = OrderedDict( (name, None) for name in self._segment_names )
-                for name, start, end in zip(self._segment_names, self._segment_times, self._segment_times[1:]):
-                    segment_times[name] = self._convert_time(end-start)
+                if self._all_segments_version != self._version:
+                    segment_times = OrderedDict( (name, None) for name in self._segment_names )
+                    for name, duration in zip(self._segment_names, self.get_segment_durations()):
+                        segment_times[name] = duration
+                    # Read-only: the cached mapping is shared by every caller
+                    self._all_segments = MappingProxyType(segment_times), self._final_time
+                    self._all_segments_version = self._version
+
+                return self._all_segments
+
+    def get_time_until_display_change(self, precision: int, current_time: int|None=None,
+                                      segment_offsets=(), segment_thresholds=()) -> float|None:
+        # segment_offsets: other displayed values following the current segment
+        # time, as value = ±(segment time + offset). segment_thresholds: segment
+        # times at which the display changes otherwise (e.g. a row appears).
+        # Both in seconds.
+        if not self.is_ongoing:
+            return None
 
-                return segment_times, self._final_time
+        # Times are displayed rounded to the given number of decimals: they
+        # change when the segment or total time crosses half a display unit.
+        display_unit = 10**(9-precision)
+        if current_time is None:
+            current_time = self._clock()
+        segment_start = self._segment_times[self._split_count-1]
+        starts = [self._segment_times[0], segment_start]
+        starts.extend(segment_start - round(offset*1e9) for offset in segment_offsets)
+        time_until_change = min(
+                display_unit - (current_time - start + display_unit//2) % display_unit
+                for start in starts
+            )
+        for threshold in segment_thresholds:
+            time_until_threshold = segment_start + round(threshold*1e9) - current_time
+            if 0 < time_until_threshold < time_until_change:
+                time_until_change = time_until_threshold
+        return self._convert_time(time_until_change)
 
     @property
     def is_ready(self) -> bool:
@@ -78,19 +161,35 @@ class Splitter:
     def has_run_ended(self) -> bool:
         return self._run_state == RunState.ENDED
 
-    def _start(self):
+    def _start(self, timestamp=None):
         if len(self._segment_names)==0:
             warnings.warn("Could not start run: no segments.")
             return
         self._run_state = RunState.ONGOING
-        self._add_split_time()
+        self._add_split_time(timestamp)
+        self._notify("start")
 
     def _end(self):
-        self._final_time = self._convert_time(self._segment_times[-1] - self._segment_times[0])
+        self._final_time = self._convert_time(self._segment_times[self._split_count-1] - self._segment_times[0])
         self._run_state = RunState.ENDED
+        self._version += 1
+        self._notify("end")
 
     def _convert_time(self, time: int)->float:
         return time/1e9
 
-    def _add_split_time(self):
-        self._segment_times.append(perf_counter_ns())
+    def _add_split_time(self, timestamp=None):
+        split_time = self._clock()
+        if timestamp is not None:
+            self.latency_histogram.record(split_time - timestamp)
+            if self._split_count > 0 and timestamp < self._segment_times[self._split_count-1]:
+                warnings.warn("Split timestamp precedes the previous split. Previous split time used.")
+                timestamp = self._segment_times[self._split_count-1]
+            split_time = timestamp
+
+        self._segment_times[self._split_count] = split_time
+        if self._split_count > 0:
+            self._segment_durations[self._split_count-1] = \
+                    self._convert_time(split_time - self._segment_times[self._split_count-1])
+        self._split_count += 1
+        self._version += 1
@@ -0,0 +1,218 @@
+import os
+import sys
+import sqlite3
+import warnings
+import argparse
+from contextlib import closing
+from time import time_ns
+
+from pysplitter.core import cache, summary
+from pysplitter.core import database as json_database
+
+
+database_file = "pysplitter.sqlite3"
+
+_schema = """
+CREATE TABLE IF NOT EXISTS speedruns (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    speedrun_id INTEGER NOT NULL REFERENCES speedruns(id),
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    UNIQUE (speedrun_id, name)
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    speedrun_id INTEGER NOT NULL REFERENCES speedruns(id),
+    timestamp INTEGER,
+    final_time REAL
+);
+CREATE TABLE IF NOT EXISTS segment_times (
+    attempt_id INTEGER NOT NULL REFERENCES attempts(id),
+    segment_id INTEGER NOT NULL REFERENCES segments(id),
+    time REAL,
+    PRIMARY KEY (attempt_id, segment_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS attempts_by_timestamp ON attempts (speedrun_id, timestamp);
+CREATE INDEX IF NOT EXISTS attempts_by_final_time ON attempts (speedrun_id, final_time);
+CREATE INDEX IF NOT EXISTS segment_times_by_attempt ON segment_times (segment_id, attempt_id);
+CREATE INDEX IF NOT EXISTS segment_times_by_time ON segment_times (segment_id, time);
+"""
+
+
+def _get_database_file_name(database_dir):
+    return os.path.join(database_dir, database_file)
+
+
+def connect(database_dir):
+    connection = sqlite3.connect(_get_database_file_name(database_dir))
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("PRAGMA foreign_keys=ON")
+    connection.executescript(_schema)
+    return connection
+
+
+def _get_speedrun_id(connection, speedrun_name, create=True):
+    row = connection.execute("SELECT id FROM speedruns WHERE name=?", (speedrun_name,)).fetchone()
+    if row is not None:
+        return row[0]
+    if not create:
+        return None
+    return connection.execute("INSERT INTO speedruns (name) VALUES (?)", (speedrun_name,)).lastrowid
+
+
+def _get_segment_ids(connection, speedrun_id, segment_names):
+    segment_ids = dict(connection.execute("SELECT name, id FROM segments WHERE speedrun_id=?", (speedrun_id,)))
+    position = len(segment_ids)
+    for segment in segment_names:
+        if segment not in segment_ids:
+            segment_ids[segment] = connection.execute(
+                    "INSERT INTO segments (speedrun_id, name, position) VALUES (?, ?, ?)",
+                    (speedrun_id, segment, position)
+                ).lastrowid
+            position += 1
+    return segment_ids
+
+
+def _get_segment_id(connection, speedrun_name, segment_name):
+    row = connection.execute(
+            "SELECT segments.id FROM segments JOIN speedruns ON speedruns.id=segments.speedrun_id "
+            "WHERE speedruns.name=? AND segments.name=?", (speedrun_name, segment_name)
+        ).fetchone()
+    return None if row is None else row[0]
+
+
+def _insert_runs(connection, speedrun_name, runs):
+    speedrun_id = _get_speedrun_id(connection, speedrun_name)
+    segment_ids = {}
+    for segment_times, final_time, timestamp in runs:
+        if any(segment not in segment_ids for segment in segment_times):
+            segment_ids = _get_segment_ids(connection, speedrun_id, segment_times.keys())
+
+        attempt_id = connection.execute(
+                "INSERT INTO attempts (speedrun_id, timestamp, final_time) VALUES (?, ?, ?)",
+                (speedrun_id, timestamp, final_time)
+            ).lastrowid
+        connection.executemany(
+                "INSERT INTO segment_times (attempt_id, segment_id, time) VALUES (?, ?, ?)",
+                [(attempt_id, segment_ids[segment], time) for segment, time in segment_times.items()]
+            )
+
+
+def append_runs_to_database(database_dir, speedrun_name, runs):
+    if not os.path.isdir(database_dir):
+        warnings.warn(f'Could not update database. Database directory "{database_dir}" does not exist.')
+        return
+
+    runs = list(runs)
+    if not runs:
+        return
+
+    cache.invalidate_cache(database_dir, speedrun_name)
+    with closing(connect(database_dir)) as connection, connection:
+        _insert_runs(connection, speedrun_name, runs)
+
+    json_database.update_aggregates(database_dir, speedrun_name, runs, load_database)
+
+
+def update_database(database_dir, speedrun_name, segment_times, final_time=None):
+    append_runs_to_database(database_dir, speedrun_name, [(segment_times, final_time, time_ns())])
+
+
+def load_database(database_dir, speedrun_name):
+    with closing(connect(database_dir)) as connection:
+        speedrun_id = _get_speedrun_id(connection, speedrun_name, create=False)
+        if speedrun_id is None:
+            return {}
+
+        database = {name: [] for name, in connection.execute(
+                "SELECT name FROM segments WHERE speedrun_id=? ORDER BY position", (speedrun_id,))}
+
+        attempts = connection.execute(
+                "SELECT segments.name, segment_times.time FROM attempts "
+                "JOIN segment_times ON segment_times.attempt_id=attempts.id "
+                "JOIN segments ON segments.id=segment_times.segment_id "
+                "WHERE attempts.speedrun_id=? ORDER BY attempts.id", (speedrun_id,))
+        for segment, time in attempts:
+            database[segment].append(time)
+
+        database["__final_time"] = [final_time for final_time, in connection.execute(
+                "SELECT final_time FROM attempts WHERE speedrun_id=? ORDER BY id", (speedrun_id,))]
+
+        return {name: times for name, times in database.items() if times}
+
+
+def database_exists(database_dir, speedrun_name):
+    if not os.path.isfile(_get_database_file_name(database_dir)):
+        return False
+    with closing(connect(database_dir)) as connection:
+        return _get_speedrun_id(connection, speedrun_name, create=False) is not None
+
+
+# Files whose content determines the results computed from the history. Commits
+# may only be in the write-ahead log until it is checkpointed.
+def get_database_files(database_dir, speedrun_name):
+    file_name = _get_database_file_name(database_dir)
+    return [file_name, file_name+"-wal", summary.get_summary_file_name(database_dir, speedrun_name)]
+
+
+def get_speedrun_names(database_dir):
+    if not os.path.isfile(_get_database_file_name(database_dir)):
+        return []
+    with closing(connect(database_dir)) as connection:
+        return sorted(name for name, in connection.execute("SELECT name FROM speedruns"))
+
+
+def get_last_segment_times(database_dir, speedrun_name, segment_name, count):
+    with closing(connect(database_dir)) as connection:
+        segment_id = _get_segment_id(connection, speedrun_name, segment_name)
+        return [time for time, in connection.execute(
+                "SELECT time FROM segment_times WHERE segment_id=? AND time IS NOT NULL "
+                "ORDER BY attempt_id DESC LIMIT ?", (segment_id, count))]
+
+
+def get_segment_times_faster_than(database_dir, speedrun_name, segment_name, time):
+    with closing(connect(database_dir)) as connection:
+        segment_id = _get_segment_id(connection, speedrun_name, segment_name)
+        return connection.execute(
+                "SELECT attempt_id, time FROM segment_times WHERE segment_id=? AND time<? ORDER BY time",
+                (segment_id, time)).fetchall()
+
+
+def get_attempts_faster_than(database_dir, speedrun_name, final_time):
+    with closing(connect(database_dir)) as connection:
+        return connection.execute(
+                "SELECT attempts.id, attempts.timestamp, attempts.final_time FROM attempts "
+                "JOIN speedruns ON speedruns.id=attempts.speedrun_id "
+                "WHERE speedruns.name=? AND attempts.final_time<? ORDER BY attempts.final_time",
+                (speedrun_name, final_time)).fetchall()
+
+
+def migrate_json_database(database_dir, batch_size=1000):
+    with closing(connect(database_dir)) as connection:
+        for speedrun_name in json_database.get_speedrun_names(database_dir):
+            if _get_speedrun_id(connection, speedrun_name, create=False) is not None:
+                warnings.warn(f'Speedrun "{speedrun_name}" skipped: already in the SQLite database.')
+                continue
+
+            batch = []
+            for segment_times, final_time in json_database.get_aligned_runs(json_database.load_database(database_dir, speedrun_name)):
+                batch.append((segment_times, final_time, None))
+                if len(batch) == batch_size:
+                    with connection:
+                        _insert_runs(connection, speedrun_name, batch)
+                    batch = []
+            with connection:
+                _insert_runs(connection, speedrun_name, batch)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrates the JSON databases to SQLite.")
+    parser.add_argument(metavar="database directory", dest="database_dir")
+    parser.add_argument("-b", metavar="batch size", dest="batch_size", type=int, default=1000)
+    args = parser.parse_args(sys.argv[1:])
+    migrate_json_database(args.database_dir, args.batch_size)
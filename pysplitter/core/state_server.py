@@ -0,0 +1,235 @@
+import os
+import time
+import asyncio
+import threading
+import warnings
+from time import perf_counter_ns
+
+from pysplitter.core import codec
+from pysplitter.core.splitter import Splitter, TimeInformation
+from pysplitter.core.records import SpeedrunRecords, to_optional
+
+
+# Pushes run state changes to any number of local clients, as one compact JSON
+# object per line. Nothing is sent while the timer ticks: clients derive the
+# current time from the wall-clock start timestamp (in ns). Clients first
+# receive a "state" message with the whole run state (sent again when the
+# records change), then events:
+#   {"event":"start","start":<ns>}
+#   {"event":"split","segment":<index>,"time":<s>,"delta":<s>,"total_delta":<s>,"total_time":<s>}
+#   {"event":"undo","segment":<index>}
+#   {"event":"reset"}
+#   {"event":"end","final_time":<s>,"delta":<s>}
+# Deltas are against the personal best and null when it is unknown.
+
+# Messages queued for a client that doesn't read them. Beyond, it is disconnected.
+max_pending_messages = 1024
+
+
+def parse_address(address: str):
+    # "host:port" for TCP, a path (containing a "/") for a Unix socket
+    if os.sep in address or "/" in address:
+        return None, address
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f'Invalid state server address "{address}": expected "host:port" or a socket path.')
+    return host, int(port)
+
+
+class StateServer:
+    # The asyncio loop runs on its own thread: publishing only schedules the
+    # broadcast, so the timer thread never waits for clients.
+    def __init__(self, address: str):
+        self.address = address
+        self._host, self._port = parse_address(address)
+        self._clients = set()
+        self._snapshot = None
+        self._loop = None
+        self._server = None
+        self._stopped = None
+        self._started = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="StateServer", daemon=True)
+
+    @property
+    def is_running(self)->bool:
+        return self._thread.is_alive()
+
+    @property
+    def client_count(self)->int:
+        return len(self._clients)
+
+    # Bound (host, port) for TCP, or the socket path
+    def get_bound_address(self):
+        if self._server is None or not self._server.sockets:
+            return None
+        return self._server.sockets[0].getsockname()
+
+    def start(self):
+        self._thread.start()
+        self._started.wait()
+        if self._error is not None:
+            raise self._error
+
+    def stop(self):
+        if self.is_running:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+            self._thread.join()
+
+    def publish(self, message: dict, snapshot: dict|None=None):
+        if not self.is_running:
+            return
+        data = self._encode(message)
+        snapshot = self._encode(snapshot) if snapshot is not None else None
+        self._loop.call_soon_threadsafe(self._broadcast, data, snapshot)
+
+    @staticmethod
+    def _encode(message):
+        return (codec.dumps(message)+"\n").encode()
+
+    def _run(self):
+        try:
+            asyncio.run(self._serve())
+        except Exception as error:
+            self._error = error
+            self._started.set()
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        if self._host is None:
+            if os.path.exists(self._port):
+                os.remove(self._port)  # Stale socket of a previous session
+            self._server = await asyncio.start_unix_server(self._handle_client, self._port)
+        else:
+            self._server = await asyncio.start_server(self._handle_client, self._host, self._port)
+        self._started.set()
+
+        async with self._server:
+            await self._stopped.wait()
+            for client in list(self._clients):
+                self._disconnect(client)
+        if self._host is None and os.path.exists(self._port):
+            os.remove(self._port)
+
+    def _broadcast(self, data, snapshot):
+        if snapshot is not None:
+            self._snapshot = snapshot
+        for client in list(self._clients):
+            try:
+                client.put_nowait(data)
+            except asyncio.QueueFull:
+                warnings.warn("State server client too slow: disconnected.")
+                self._disconnect(client)
+
+    def _disconnect(self, client):
+        self._clients.discard(client)
+        if client.full():
+            client.get_nowait()
+        client.put_nowait(None)
+
+    @staticmethod
+    async def _wait_disconnection(reader):
+        # Clients don't send anything: reading only detects disconnections
+        try:
+            await reader.read()
+        except ConnectionError:
+            pass
+
+    async def _handle_client(self, reader, writer):
+        messages = asyncio.Queue(max_pending_messages)
+        if self._snapshot is not None:
+            messages.put_nowait(self._snapshot)
+        self._clients.add(messages)
+        disconnection = asyncio.ensure_future(self._wait_disconnection(reader))
+        next_message = None
+        try:
+            while True:
+                next_message = asyncio.ensure_future(messages.get())
+                await asyncio.wait((next_message, disconnection), return_when=asyncio.FIRST_COMPLETED)
+                if disconnection.done() or (message := next_message.result()) is None:
+                    break
+                writer.write(message)
+                if messages.empty():
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.discard(messages)
+            disconnection.cancel()
+            if next_message is not None:
+                next_message.cancel()
+            writer.close()
+
+
+class RunPublisher:
+    # Listens to a splitter and publishes its events with the records' deltas.
+    def __init__(self, server: StateServer, splitter: Splitter, records: SpeedrunRecords):
+        self.server = server
+        self.splitter = splitter
+        self.records = records
+        # perf_counter_ns has an arbitrary origin: starts are sent in wall-clock time
+        self._clock_offset = time.time_ns() - perf_counter_ns()
+        self.splitter.add_listener(self._on_event)
+        state = self.get_state()
+        self.server.publish(state, state)
+
+    def detach(self):
+        self.splitter.remove_listener(self._on_event)
+
+    def _get_start(self):
+        timestamps = self.splitter.get_split_timestamps()
+        return timestamps[0] + self._clock_offset if len(timestamps) else None
+
+    def get_state(self)->dict:
+        if self.splitter.is_ongoing:
+            state = "ongoing"
+        elif self.splitter.has_run_ended:
+            state = "ended"
+        else:
+            state = "ready"
+        _, final_time = self.splitter.get_time(TimeInformation.ALL_SEGMENTS) or (None, None)
+        return {
+                "event": "state",
+                "name": self.records.name,
+                "segments": self.records.segment_names,
+                "pb_splits": [to_optional(split) for split in self.records.pb_splits],
+                "pb": self.records.pb,
+                "run_state": state,
+                "start": self._get_start(),
+                "times": list(self.splitter.get_segment_durations()),
+                "final_time": final_time,
+            }
+
+    def _get_delta(self, run_time, reference):
+        return None if reference is None else to_optional(run_time-reference)
+
+    def _on_event(self, splitter, event):
+        match event:
+            case "start":
+                message = {"event": "start", "start": self._get_start()}
+            case "split":
+                segment_index = splitter.get_current_segment_index()-1
+                segment_time = splitter.get_segment_durations()[segment_index]
+                timestamps = splitter.get_split_timestamps()
+                total_time = (timestamps[-1]-timestamps[0])/1e9
+                message = {
+                        "event": "split",
+                        "segment": segment_index,
+                        "time": segment_time,
+                        "delta": self._get_delta(segment_time, self.records.pb_splits[segment_index]),
+                        "total_time": total_time,
+                        "total_delta": self._get_delta(total_time,
+                                                       self.records.get_prefix_sum("pb_splits", segment_index+1)),
+                    }
+            case "undo":
+                message = {"event": "undo", "segment": splitter.get_current_segment_index()}
+            case "reset":
+                message = {"event": "reset"}
+            case "end":
+                _, final_time = splitter.get_time(TimeInformation.ALL_SEGMENTS)
+                message = {"event": "end", "final_time": final_time,
+                           "delta": self._get_delta(final_time, self.records.pb)}
+            case _:
+                return
+        self.server.publish(message, self.get_state())
@@ -0,0 +1,102 @@
+import os
+import json
+import math
+
+
+last_times_size = 20
+
+
+class SegmentStatistics:
+    def __init__(self, count=0, mean=0., m2=0., min=None, max=None, last_times=None, last_position=0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = min
+        self.max = max
+        self.last_times = last_times if last_times is not None else []
+        self.last_position = last_position
+
+    def add(self, time):
+        if time is None:
+            return
+
+        # Welford's online algorithm
+        self.count += 1
+        delta = time - self.mean
+        self.mean += delta/self.count
+        self.m2 += delta*(time - self.mean)
+
+        self.min = time if self.min is None else min(self.min, time)
+        self.max = time if self.max is None else max(self.max, time)
+
+        if len(self.last_times) < last_times_size:
+            self.last_times.append(time)
+        else:
+            self.last_times[self.last_position] = time
+        self.last_position = (self.last_position+1) % last_times_size
+
+    @property
+    def variance(self):
+        return self.m2/self.count if self.count > 0 else None
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2/self.count) if self.count > 0 else None
+
+    def get_last_times(self):
+        if len(self.last_times) < last_times_size:
+            return self.last_times.copy()
+        return self.last_times[self.last_position:] + self.last_times[:self.last_position]
+
+    def to_dict(self):
+        return self.__dict__.copy()
+
+    @staticmethod
+    def from_dict(content):
+        return SegmentStatistics(**content)
+
+
+def get_summary_file_name(database_dir, speedrun_name):
+    return os.path.join(database_dir, speedrun_name+".summary")
+
+
+def summary_exists(database_dir, speedrun_name):
+    return os.path.isfile(get_summary_file_name(database_dir, speedrun_name))
+
+
+def add_times_to_summary(summary, segment_times, final_time=None):
+    for segment, time in segment_times.items():
+        summary.setdefault(segment, SegmentStatistics()).add(time)
+    summary.setdefault("__final_time", SegmentStatistics()).add(final_time)
+
+
+def build_summary(database):
+    summary = {}
+    for segment, times in database.items():
+        statistics = summary[segment] = SegmentStatistics()
+        for time in times:
+            statistics.add(time)
+    return summary
+
+
+def load_summary(database_dir, speedrun_name):
+    file_name = get_summary_file_name(database_dir, speedrun_name)
+    if not os.path.isfile(file_name):
+        return {}
+
+    with open(file_name, "r") as file_stream:
+        return {segment: SegmentStatistics.from_dict(content) for segment, content in json.load(file_stream).items()}
+
+
+def write_summary(database_dir, speedrun_name, summary):
+    file_name = get_summary_file_name(database_dir, speedrun_name)
+    with open(file_name+".tmp", "w") as file_stream:
+        json.dump({segment: statistics.to_dict() for segment, statistics in summary.items()}, file_stream)
+    os.replace(file_name+".tmp", file_name)
+
+
+def update_summary(database_dir, speedrun_name, runs):
+    summary = load_summary(database_dir, speedrun_name)
+    for segment_times, final_time, *_ in runs:
+        add_times_to_summary(summary, segment_times, final_time)
+    write_summary(database_dir, speedrun_name, summary)
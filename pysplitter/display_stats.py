@@ -0,0 +1,397 @@
+import io
+import os
+import sys
+import json
+import argparse
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import matplotlib
+from matplotlib import rcParams
+from matplotlib.figure import Figure
+
+from pysplitter.config import database_directory, database_backend
+from pysplitter.core import cache
+from pysplitter.core.backends import database_backends, get_database_backend
+from pysplitter.core.columnar import load_columns
+from pysplitter.core.summary import load_summary
+from pysplitter.core.sketch import load_sketches
+from pysplitter.core.density import estimate_densities
+
+
+valid_sorting = ["temporal", "mean", "name"]
+report_formats = ["png", "svg"]
+statistics_columns = ["min", "max", "mean", "std", "rel std"]
+# Changing how statistics are computed requires a new version, which invalidates cached statistics
+statistics_version = 1
+
+
+def format_time(seconds, _=None):
+    formatted_string = ""
+    element_number = 0
+
+    if seconds>=3600:
+        formatted_string += f"{int(seconds//3600)}h "
+        seconds = seconds % 3600
+        element_number += 1
+
+    if seconds>=60 or element_number > 1:
+        formatted_string += f"{int(seconds//60)}m "
+        seconds = seconds % 60
+        element_number += 1
+
+    if not element_number == 2 and (seconds >=0 or element_number<2):
+        formatted_string += f"{int(seconds)}s "
+        seconds = seconds % 1
+        element_number += 1
+
+    if not element_number == 2 and (seconds >=0 or element_number<2):
+        formatted_string += f"{int(seconds*1000)}ms "
+
+    return formatted_string
+
+
+midblack ="#3d3d3d"
+lightgray = "#ababab"
+
+colors = [
+        "#50514f",
+        "#f25f5c",
+        "#FDBF61",
+        "#247ba0",
+        "#70c1b3",
+    ]
+group_size = 5
+
+
+def set_plot_style():
+    rcParams["axes.labelsize"] = 15
+    rcParams["axes.facecolor"] = "white"
+    rcParams["axes.grid"] = False
+    rcParams["axes.edgecolor"] = lightgray
+    rcParams['axes.spines.left'] = False
+    rcParams['axes.spines.right'] = False
+    rcParams['axes.spines.top'] = False
+
+    rcParams["xtick.labelsize"] = 9
+    rcParams["ytick.labelsize"] = 9
+    rcParams["xtick.color"] = midblack
+    rcParams["ytick.color"] = midblack
+
+    rcParams["legend.edgecolor"] = "white"
+    rcParams["legend.fontsize"] = 10
+    rcParams["text.color"] = midblack
+
+
+def load_speedrun_data(database_dir, speedrun_name, backend=database_backend):
+    # The columnar store is only kept along the JSON database
+    speedrun_data = load_columns(database_dir, speedrun_name) if backend == "json" else {}
+    if not speedrun_data:
+        speedrun_data = get_database_backend(backend).load_database(database_dir, speedrun_name)
+    return speedrun_data
+
+
+def get_segments_statistics(speedrun_data, segment_names, speedrun_summary, sorting="mean", stream=sys.stdout):
+    if sorting not in valid_sorting:
+        raise ValueError(f'Sorting "{sorting}" invalid.')
+
+    segments_data = []
+    found_segments = []
+    segments_samples = []
+
+    for segment_name in list(segment_names) + ["__final_time"]:
+        if speedrun_data.get(segment_name) is None:
+            print(f'Skipping segment "{segment_name}". Data not found.', file=stream)
+            continue
+
+        collected_data = np.asarray(speedrun_data[segment_name], dtype=float)
+        collected_data = collected_data[~np.isnan(collected_data)]
+        if len(collected_data) <= 1:
+            print(f'Skipping segment "{segment_name}". Insufficient data to provide statistics.', file=stream)
+            continue
+
+        segment = {}
+        statistics = speedrun_summary.get(segment_name)
+        if statistics is not None and statistics.count == len(collected_data):
+            segment["min"] = statistics.min
+            segment["max"] = statistics.max
+            segment["mean"] = statistics.mean
+            segment["std"] = statistics.std
+        else:
+            segment["min"] = np.min(collected_data)
+            segment["max"] = np.max(collected_data)
+            segment["mean"] = np.mean(collected_data)
+            segment["std"] = np.std(collected_data)
+        segment["rel std"] = segment["std"]/segment["mean"]
+
+        segments_data.append(segment)
+        found_segments.append(segment_name)
+        segments_samples.append(collected_data)
+
+    if segments_data == []:
+        return None
+
+    for segment, points, density in zip(segments_data, *estimate_densities(segments_samples, bandwidth_factor=0.5)):
+        segment["points"] = points
+        segment["density"] = density
+
+    segments_data = pd.DataFrame(segments_data, index=found_segments)
+    if sorting == "mean":
+        segments_data.sort_values("mean", ascending=False, inplace=True)
+    elif sorting == "name":
+        segments_data.sort_index(ascending=False, inplace=True)
+    return segments_data
+
+
+def _write_cached_statistics(file_name, segments_data, messages):
+    os.makedirs(os.path.dirname(file_name), exist_ok=True)
+    arrays = {"messages": np.array(messages)}
+    if segments_data is not None:
+        arrays["index"] = np.array(segments_data.index, dtype=str)
+        arrays["points"] = np.stack(segments_data["points"].to_list())
+        arrays["density"] = np.stack(segments_data["density"].to_list())
+        for column in statistics_columns:
+            arrays[column] = segments_data[column].to_numpy(dtype=float)
+
+    with open(file_name+".tmp", "wb") as file_stream:
+        np.savez(file_stream, **arrays)
+    os.replace(file_name+".tmp", file_name)
+
+
+def _load_cached_statistics(file_name):
+    with np.load(file_name, allow_pickle=False) as arrays:
+        messages = str(arrays["messages"])
+        if "index" not in arrays:
+            return None, messages
+
+        segments_data = pd.DataFrame({column: arrays[column] for column in statistics_columns}, index=list(arrays["index"]))
+        segments_data["points"] = list(arrays["points"])
+        segments_data["density"] = list(arrays["density"])
+    return segments_data, messages
+
+
+# Statistics of the segments (all by default), cached in the database directory.
+def load_segments_statistics(database_dir, speedrun_name, segment_names=None, sorting="mean", stream=sys.stdout, use_cache=True,
+                             backend=database_backend):
+    database = get_database_backend(backend)
+    options = {"segments": None if segment_names is None else list(segment_names), "sorting": sorting,
+               "version": statistics_version, "backend": backend}
+    key = cache.get_cache_key(database.get_database_files(database_dir, speedrun_name), options)
+    cache_file_name = cache.get_cache_file_name(database_dir, speedrun_name, key, ".npz")
+
+    if use_cache and os.path.isfile(cache_file_name):
+        try:
+            segments_data, messages = _load_cached_statistics(cache_file_name)
+        except (OSError, ValueError, KeyError) as error:
+            warnings.warn(f'Invalid statistics cache "{cache_file_name}" ignored: {error}')
+        else:
+            stream.write(messages)
+            return segments_data
+
+    speedrun_data = load_speedrun_data(database_dir, speedrun_name, backend)
+    if segment_names is None:
+        segment_names = [segment_name for segment_name in speedrun_data if not segment_name.startswith("__")]
+
+    messages = io.StringIO()
+    segments_data = get_segments_statistics(speedrun_data, segment_names, load_summary(database_dir, speedrun_name),
+                                            sorting, messages)
+    stream.write(messages.getvalue())
+
+    if use_cache and database.database_exists(database_dir, speedrun_name):
+        _write_cached_statistics(cache_file_name, segments_data, messages.getvalue())
+    return segments_data
+
+
+def write_text_summary(segments_data, best_segments, speedrun_sketches, stream=sys.stdout):
+    if best_segments is not None and None not in best_segments:
+        print("Sum of best:", format_time(sum(best_segments)), file=stream)
+
+    segments_no_final = segments_data.drop("__final_time", errors="ignore")
+    print("Most consistent:", file=stream)
+    print(segments_no_final.sort_values("std", ascending=True).head(5)[["std"]], file=stream)
+
+    print("Most inconsistent:", file=stream)
+    print(segments_no_final.sort_values("std", ascending=False).head(5)[["std"]], file=stream)
+
+    sketched_segments = [segment_name for segment_name in segments_data.index if segment_name in speedrun_sketches]
+    if sketched_segments:
+        percentiles = pd.DataFrame(
+                [{f"p{int(100*quantile)}": speedrun_sketches[segment_name].quantile(quantile) for quantile in (0.1, 0.5, 0.9)}
+                    for segment_name in sketched_segments],
+                index=sketched_segments
+            )
+        print("Percentiles:", file=stream)
+        print(percentiles, file=stream)
+
+
+def get_group_number(segments_data):
+    final_times_set = "__final_time" in segments_data.index
+    return int(np.ceil((segments_data.shape[0]-final_times_set)/group_size) + final_times_set)
+
+
+def get_figure_size(segments_data):
+    return (6, (2*get_group_number(segments_data))+1)
+
+
+def plot_distribution(ax, row, label=None, color=colors[0]):
+    xvalues, yvalues = row["points"], row["density"]
+
+    ax.plot(xvalues, yvalues, label=label, color=color)
+    ax.fill_between(xvalues, yvalues, color=color, alpha=0.3)
+
+
+def plot_distributions(fig, segments_data):
+    axes = fig.subplots(get_group_number(segments_data), squeeze=False)[:, 0]
+
+    group_index = 0
+    current_group_index = 0
+    for (index, row), segment_name in zip(segments_data.iterrows(), segments_data.index):
+        if segment_name == "__final_time":
+            plot_distribution(axes[-1], row, "Final time", colors[0])
+            continue
+
+        if current_group_index == group_size:
+            current_group_index = 0
+            group_index += 1
+
+        plot_distribution(axes[group_index], row, segment_name, colors[current_group_index])
+
+        current_group_index += 1
+
+    for ax in axes:
+        ax.set_yticks([])
+        ax.xaxis.set_major_formatter(format_time)
+        ax.legend()
+
+    axes[-1].set_xlabel("Time [s]")
+
+    fig.tight_layout()
+
+
+def load_split_file(split_file_name):
+    if not os.path.isfile(split_file_name):
+        raise ValueError("Given file name does not exist.")
+    elif not split_file_name.endswith(".json"):
+        raise ValueError("Split file must be given in \".json\" format.")
+
+    with open(split_file_name, "r") as file_stream:
+        split_file_content = json.load(file_stream)
+    if "name" not in split_file_content.keys():
+        raise ValueError("Invalid split file. Entry \"name\" is missing.")
+    return split_file_content
+
+
+def display_statistics(split_file_name, database_dir=database_directory, sorting="mean", segment_names=None, use_cache=True,
+                       backend=database_backend):
+    from matplotlib import pyplot as plt
+
+    split_file_content = load_split_file(split_file_name)
+    speedrun_name = split_file_content["name"]
+    segment_names = segment_names if segment_names else split_file_content["segment_names"]
+
+    if not get_database_backend(backend).database_exists(database_dir, speedrun_name):
+        print("No data acquired for this run.")
+        return
+
+    segments_data = load_segments_statistics(database_dir, speedrun_name, segment_names, sorting, use_cache=use_cache,
+                                             backend=backend)
+    if segments_data is None:
+        print("No data to display.")
+        return
+    write_text_summary(segments_data, split_file_content.get("best_splits"), load_sketches(database_dir, speedrun_name))
+
+    set_plot_style()
+    fig = plt.figure(num=f"PySplitter - Split distributions for run {speedrun_name}",
+                     figsize=get_figure_size(segments_data))
+    plot_distributions(fig, segments_data)
+    plt.show()
+
+
+# Reports are rendered without pyplot: figures aren't registered in a global
+# state and are drawn by the Agg canvas, so they can be rendered in any process.
+def write_report(database_dir, speedrun_name, output_dir, formats=("png",), sorting="mean", use_cache=True,
+                 backend=database_backend):
+    file_names = []
+
+    summary_file_name = os.path.join(output_dir, speedrun_name+".txt")
+    with open(summary_file_name, "w") as stream:
+        print(f"Speedrun: {speedrun_name}", file=stream)
+        segments_data = load_segments_statistics(database_dir, speedrun_name, None, sorting, stream, use_cache, backend)
+        if segments_data is None:
+            print("No data to display.", file=stream)
+        else:
+            write_text_summary(segments_data, None, load_sketches(database_dir, speedrun_name), stream)
+    file_names.append(summary_file_name)
+
+    if segments_data is not None:
+        set_plot_style()
+        fig = Figure(figsize=get_figure_size(segments_data))
+        fig.suptitle(speedrun_name)
+        plot_distributions(fig, segments_data)
+        for file_format in formats:
+            file_names.append(os.path.join(output_dir, f"{speedrun_name}.{file_format}"))
+            fig.savefig(file_names[-1], format=file_format)
+    return file_names
+
+
+def _use_headless_backend():
+    matplotlib.use("Agg")
+
+
+def write_reports(database_dir, output_dir, formats=("png",), sorting="mean", process_number=None, use_cache=True,
+                  backend=database_backend):
+    for file_format in formats:
+        if file_format not in report_formats:
+            raise ValueError(f'Report format "{file_format}" invalid. Available formats: {", ".join(report_formats)}.')
+
+    os.makedirs(output_dir, exist_ok=True)
+    speedrun_names = get_database_backend(backend).get_speedrun_names(database_dir)
+
+    file_names = []
+    with ProcessPoolExecutor(process_number, initializer=_use_headless_backend) as executor:
+        reports = {speedrun_name: executor.submit(write_report, database_dir, speedrun_name, output_dir, formats, sorting,
+                                                   use_cache, backend)
+                        for speedrun_name in speedrun_names}
+        for speedrun_name, report in reports.items():
+            try:
+                file_names += report.result()
+            except Exception as error:
+                warnings.warn(f'Report of speedrun "{speedrun_name}" failed: {error}')
+    return file_names
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Displays the split distributions of a speedrun, "
+                                                 "or writes reports for every speedrun of the database.")
+    parser.add_argument(metavar="split file name", dest="split_filename", nargs="?")
+    parser.add_argument("-o", metavar="oredering type", dest="sorting", default="mean",
+                        help="One of "+str(valid_sorting))
+    parser.add_argument("-s", metavar="segments", nargs="+",
+                        help="Displayed segments")
+    parser.add_argument("-d", metavar="database directory", dest="database_dir", default=database_directory)
+    parser.add_argument("--batch", metavar="output directory", dest="output_dir",
+                        help="Writes headless reports for every speedrun in the database directory")
+    parser.add_argument("-f", metavar="formats", dest="formats", nargs="+", default=["png"],
+                        help="Report formats, among "+str(report_formats))
+    parser.add_argument("-j", metavar="processes", dest="process_number", type=int, default=None,
+                        help="Number of report processes, the number of cores by default")
+    parser.add_argument("-b", metavar="backend", dest="backend", default=database_backend, choices=list(database_backends),
+                        help="Database backend, among "+str(list(database_backends)))
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                        help="Recomputes the statistics instead of using the cached ones")
+    args = parser.parse_args(argv)
+
+    if args.output_dir is not None:
+        for file_name in write_reports(args.database_dir, args.output_dir, args.formats, args.sorting,
+                                    args.process_number, args.use_cache, args.backend):
+            print(file_name)
+    elif args.split_filename is None:
+        parser.error("A split file name is required when not in batch mode.")
+    else:
+        display_statistics(args.split_filename, args.database_dir, args.sorting, args.s, args.use_cache, args.backend)
+
+
+if __name__ == "__main__":
+    main()
@@ -25,7 +25,8 @@ class PySplitButton(QtWidgets.QPushButton):
     def event(self, event):
         # Redirect event
         if event.type() == QtCore.QEvent.KeyPress and event.key() in keymaps.values():
-            return self.main_window.keyPressEvent(event)
+            self.main_window.keyPressEvent(event)
+            return True
         return QtWidgets.QPushButton.event(self, event)
 
 
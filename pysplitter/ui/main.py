@@ -1,81 +1,136 @@
+import os
 import sys
+import math
 import warnings
 from PyQt5 import QtCore, QtWidgets
 
 from pysplitter.core.splitter import Splitter, TimeInformation
 from pysplitter.core.records import SpeedrunRecords
-from pysplitter.core.database import update_database
+from pysplitter.core.latency import LatencyHistogram
+from pysplitter.core.inputs import InputQueue, EvdevInputBackend
+from pysplitter.core.persistence import PersistenceWorker
+from pysplitter.core.recovery import RecoveryRing
+from pysplitter.core.state_server import StateServer, RunPublisher
+from pysplitter.core.backends import database_backends
 
-from pysplitter.ui.segments import SegmentsLayout
+from pysplitter.ui.segments import SegmentsView
 from pysplitter.ui.import_export import ImportExportLayout
-from pysplitter.ui.utils import ask_yes_no_dialog
-from pysplitter.config import keymaps, refresh_delay, database_directory, ask_update_database, use_database
+from pysplitter.ui.utils import ask_yes_no_dialog, KeyPressTimestamper
+from pysplitter.ui.saving import RunSaver
+from pysplitter.config import (
+        keymaps, refresh_delay, timer_precision, use_database, database_directory, database_backend,
+        latency_histogram_file, input_backend, evdev_device, evdev_keymap, recovery_file, state_server_address,
+)
+
+
+def get_input_backend():
+    match input_backend:
+        case None:
+            return None
+        case "evdev":
+            return EvdevInputBackend(evdev_device, evdev_keymap)
+    raise ValueError(f'Unknown input backend "{input_backend}".')
 
 
 class MainWindow(QtWidgets.QWidget):
     minimum_width = 400
-    def __init__(self, parent=None, *args):
+    input_available = QtCore.pyqtSignal()
+
+    def __init__(self, parent=None, *args, input_backend=None):
         super().__init__(parent)
 
-        self.key_action = {
-                keymaps["split"]: self.split,
-                keymaps["reset"]: self.reset,
-                keymaps["undo"]: self.undo_split,
-                keymaps["load records"]: self.load_records,
-                keymaps["save records"]: self.save_records,
-                keymaps["quit"]: self.closeEvent
+        self.actions = {
+                "split": self.split,
+                "reset": self.reset,
+                "undo": self.undo_split,
+                "load records": self.load_records,
+                "save records": self.save_records,
+                "quit": self.closeEvent
             }
+        self.key_action = {keymaps[action]: function for action, function in self.actions.items()}
 
         self.setGeometry(0, 0, 200, 800)
         self.setMinimumWidth(self.minimum_width)
         self.resize(self.minimum_width, 150)
         self.setStyleSheet("background-color: #292c30; color: #e8effa;")
 
-        self._splitter = Splitter([""])
+        self.key_timestamper = KeyPressTimestamper(self.key_action.keys())
+        QtWidgets.QApplication.instance().installEventFilter(self.key_timestamper)
+
+        self.persistence_worker = PersistenceWorker()
+        self.run_saver = RunSaver(self, self.persistence_worker)
+        self.latency_histogram = LatencyHistogram()
+        self._splitter = Splitter([""], self.latency_histogram)
         self.records = None
+        self.recovery_ring = None
+        self.run_publisher = None
+        self.state_server = None
+        if state_server_address is not None:
+            try:
+                self.state_server = StateServer(state_server_address)
+                self.state_server.start()
+            except (OSError, ValueError) as error:
+                warnings.warn(f'Couldn\'t start the state server on "{state_server_address}": {error}')
+                self.state_server = None
 
         self.main_layout = QtWidgets.QVBoxLayout()
-        self.segments_layout = SegmentsLayout(
+        self.segments_view = SegmentsView(
                 [""], self.get_splitter, self._get_records
         )
-        self.main_layout.addLayout(self.segments_layout)
+        self.main_layout.addWidget(self.segments_view)
         self.import_export_layout = ImportExportLayout(self, self._set_records, self._get_records)
         self.main_layout.setContentsMargins(0, 0, 0, 0)
         self.main_layout.addLayout(self.import_export_layout)
 
+        # Armed for the next change of the displayed time, idle otherwise
         self.refresh_timer = QtCore.QTimer()
-        self.refresh_timer.setInterval(int(refresh_delay*1e3))
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setTimerType(QtCore.Qt.PreciseTimer)
         self.refresh_timer.timeout.connect(self._refresh_display)
-        self.refresh_timer.start()
 
         self.setLayout(self.main_layout)
         self.setWindowTitle("PySplitter")
 
+        # Events are timestamped on the backend thread, the signal only wakes the UI
+        self.input_queue = InputQueue(notify=self.input_available.emit)
+        self.input_available.connect(self._process_inputs)
+        self.input_backend = input_backend
+        if self.input_backend is not None:
+            self.input_backend.start(self.input_queue)
+
         self.load_records()
 
     def get_splitter(self):
         return self._splitter
 
-    def split(self):
+    def split(self, timestamp=None):
         if self.records is not None and (self._splitter.is_ongoing or self._splitter.is_ready):
-            self._splitter.split()
+            self._splitter.split(timestamp)
+            if self.recovery_ring is not None:
+                self.recovery_ring.record_splits(self._splitter.get_split_timestamps())
             self._refresh_display(segment_changed=True)
 
     def undo_split(self):
-        self.segments_layout.erase_current_split()
+        self.segments_view.erase_current_split()
         self._splitter.undo_split()
+        if self.recovery_ring is not None:
+            self.recovery_ring.record_splits(self._splitter.get_split_timestamps())
 
     def reset(self):
         if self._splitter.has_run_ended:
             self._ask_update_times()
         self._splitter.reset()
-        self.segments_layout.clear_times()
+        if self.recovery_ring is not None:
+            self.recovery_ring.clear()
+        self.segments_view.clear_times()
+        self._schedule_refresh()
 
     def load_records(self):
         self._ask_save_records()
         self.import_export_layout.load_records()
 
     def save_records(self):
+        self.persistence_worker.flush()
         self.import_export_layout.save_records()
 
     def _get_records(self)->SpeedrunRecords|None:
@@ -84,48 +139,120 @@ class MainWindow(QtWidgets.QWidget):
     def _set_records(self, splits: SpeedrunRecords):
         self.reset()
         self.records = splits
-        self._splitter = Splitter(splits.segment_names.copy())
-        self.segments_layout.set_segments_names(splits.segment_names.copy())
+        self._splitter = Splitter(splits.segment_names.copy(), self.latency_histogram)
+        if self.state_server is not None:
+            self.run_publisher = RunPublisher(self.state_server, self._splitter, self.records)
+        self.segments_view.set_segments_names(splits.segment_names.copy())
+        self._open_recovery_ring()
         self.setFixedSize(self.main_layout.sizeHint())
 
+    def _open_recovery_ring(self):
+        if self.recovery_ring is not None:
+            self.recovery_ring.close()
+            self.recovery_ring = None
+        if recovery_file is None:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(recovery_file) or ".", exist_ok=True)
+            self.recovery_ring = RecoveryRing(recovery_file, len(self.records.segment_names)+1)
+            self.recovery_ring.set_run_information(self.records.name, self.records.segment_names)
+        except OSError as error:
+            warnings.warn(f"Crash recovery disabled: {error}")
+            self.recovery_ring = None
+
     def _refresh_display(self, segment_changed=False):
-        self.segments_layout.refresh(segment_changed)
+        self.segments_view.refresh(segment_changed)
+        self._schedule_refresh()
+
+    def _schedule_refresh(self):
+        time_until_change = self.segments_view.get_time_until_display_change(timer_precision)
+        if time_until_change is None or not self.isVisible() or self.isMinimized():
+            self.refresh_timer.stop()
+            return
+
+        if 10**-timer_precision < refresh_delay:
+            time_until_change = max(time_until_change, refresh_delay)
+        self.refresh_timer.start(math.ceil(time_until_change*1e3))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.records is not None:
+            self._refresh_display()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QtCore.QEvent.WindowStateChange:
+            if self.isMinimized():
+                self.refresh_timer.stop()
+            elif self.records is not None:
+                self._refresh_display()
 
     def _ask_update_times(self):
         times = self._splitter.get_time(TimeInformation.ALL_SEGMENTS)
         if times is not None and self.records is not None:
-            segment_times, final_time = times
+            self.run_saver.save_runs([(self.records, *times)])
 
-            if use_database:
-                if not ask_update_database or (ask_update_database and ask_yes_no_dialog(self, "Add times in the database?")):
-                    update_database(database_directory, self.records.name, segment_times)
-
-            if self.records.has_new_records(segment_times, final_time) and ask_yes_no_dialog(self, "Write new record splits?"):
-                self.records.update_times(segment_times, final_time)
-                if self.records.file_name is None:
-                    warnings.warn("Couldn't update records file: path set to None.")
-                else:
-                    self.records.write_to_file(self.records.file_name)
+    def _process_inputs(self):
+        for event in self.input_queue.drain():
+            if event.action == "split":
+                self.split(event.timestamp)
+            elif event.action in self.actions:
+                self.actions[event.action]()
+            else:
+                warnings.warn(f'Unknown input action "{event.action}".')
 
     def _ask_save_records(self):
+        # Records being written are only marked up to date by the queued signal
+        self.persistence_worker.flush()
+        QtWidgets.QApplication.processEvents()
         if self.records is not None and not self.records.records_file_up_to_date:
             if ask_yes_no_dialog(self, "Would like to save the unsaved records before closing this speedrun?"):
                 self.save_records()
 
     def closeEvent(self, event=None):
         self._ask_save_records()
+        if self.input_backend is not None:
+            self.input_backend.stop()
+        self.persistence_worker.stop()
+        if self.state_server is not None:
+            self.state_server.stop()
+        if self.recovery_ring is not None:
+            self.recovery_ring.clear()
+        if latency_histogram_file is not None:
+            self.latency_histogram.write_to_file(latency_histogram_file)
         self.close()
 
     def keyPressEvent(self, event):
         if event.key() in self.key_action.keys():
-            self.key_action[event.key()]()
-            return True
+            timestamp = self.key_timestamper.pop_timestamp(event)
+            if event.key() == keymaps["split"]:
+                self.split(timestamp)
+            else:
+                self.key_action[event.key()]()
         event.accept()
 
 
+def offer_run_recovery():
+    if recovery_file is None:
+        return
+
+    interrupted_run = RecoveryRing.load_interrupted_run(recovery_file)
+    if interrupted_run is not None and use_database:
+        speedrun_name, segment_times, final_time = interrupted_run
+        if ask_yes_no_dialog(None, f'An attempt of "{speedrun_name}" was interrupted. Add its times in the database?'):
+            database_backends[database_backend].update_database(database_directory, speedrun_name, segment_times, final_time)
+    RecoveryRing.discard(recovery_file)
+
+
 def launch_main_window(args):
     app = QtWidgets.QApplication(args)
-    window = MainWindow()
+    offer_run_recovery()
+    window = MainWindow(input_backend=get_input_backend())
     window.show()
     app.exec_()
 
@@ -0,0 +1,191 @@
+import sys
+import math
+import argparse
+import warnings
+from time import perf_counter_ns
+from PyQt5 import QtCore, QtWidgets
+
+from pysplitter.core.race import Race
+from pysplitter.core.records import SpeedrunRecords, InvalidRecordsError
+from pysplitter.core.inputs import InputQueue
+from pysplitter.core.persistence import PersistenceWorker
+
+from pysplitter.ui.main import get_input_backend
+from pysplitter.ui.saving import RunSaver
+from pysplitter.ui.segments import SegmentsView
+from pysplitter.ui.utils import display_error_dialog, KeyPressTimestamper
+from pysplitter.config import (
+        race_keymaps, race_split_keys, race_visible_segments, race_show_predictions, refresh_delay, timer_precision,
+)
+
+
+# Hosts the runners of a race in one window. A single timer refreshes every
+# runner, with one clock read per refresh.
+class RaceWindow(QtWidgets.QWidget):
+    input_available = QtCore.pyqtSignal()
+
+    def __init__(self, runner_records: list[SpeedrunRecords], runner_names=None, parent=None, input_backend=None):
+        super().__init__(parent)
+        self.race = Race(runner_records)
+        runner_names = runner_names if runner_names is not None else [records.name for records in runner_records]
+
+        self.actions = {
+                "start": self.start,
+                "reset": self.reset,
+                "quit": self.closeEvent,
+            }
+        self.key_action = {race_keymaps[action]: function for action, function in self.actions.items()}
+        self.split_keys = {key: runner for runner, key in enumerate(race_split_keys[:len(self.race)])}
+
+        self.setStyleSheet("background-color: #292c30; color: #e8effa;")
+        self.key_timestamper = KeyPressTimestamper([*self.key_action.keys(), *self.split_keys.keys()])
+        QtWidgets.QApplication.instance().installEventFilter(self.key_timestamper)
+        self.persistence_worker = PersistenceWorker()
+        self.run_saver = RunSaver(self, self.persistence_worker)
+
+        self.main_layout = QtWidgets.QGridLayout()
+        self.main_layout.setContentsMargins(0, 0, 0, 0)
+        self.segments_views = []
+        column_number = math.ceil(math.sqrt(len(self.race)))
+        for runner, (records, name) in enumerate(zip(self.race.records, runner_names)):
+            runner_layout = QtWidgets.QVBoxLayout()
+            runner_layout.addWidget(QtWidgets.QLabel(name))
+            view = SegmentsView(records.segment_names.copy(), lambda runner=runner: self.race.splitters[runner],
+                                lambda runner=runner: self.race.records[runner], max_visible_rows=race_visible_segments,
+                                show_predictions=race_show_predictions)
+            runner_layout.addWidget(view)
+            self.segments_views.append(view)
+            self.main_layout.addLayout(runner_layout, runner//column_number, runner%column_number)
+        self.setLayout(self.main_layout)
+        self.setWindowTitle("PySplitter - Race")
+        self.resize(self.main_layout.sizeHint())
+
+        # Armed for the next change of any displayed time, idle otherwise
+        self.refresh_timer = QtCore.QTimer()
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.refresh_timer.timeout.connect(self._refresh_display)
+
+        self.input_queue = InputQueue(notify=self.input_available.emit)
+        self.input_available.connect(self._process_inputs)
+        self.input_backend = input_backend
+        if self.input_backend is not None:
+            self.input_backend.start(self.input_queue)
+
+    def start(self, timestamp=None):
+        if self.race.is_ready:
+            self.race.start(timestamp)
+            self._refresh_display()
+
+    def split(self, runner, timestamp=None):
+        if not 0 <= runner < len(self.race):
+            warnings.warn(f"No runner {runner} in the race.")
+            return
+        self.race.split(runner, timestamp)
+        self._refresh_display(changed_runner=runner)
+
+    def undo_split(self, runner):
+        if not 0 <= runner < len(self.race):
+            warnings.warn(f"No runner {runner} in the race.")
+            return
+        self.segments_views[runner].erase_current_split()
+        self.race.undo_split(runner)
+
+    def reset(self):
+        self._save_finished_runs()
+        self.race.reset()
+        for view in self.segments_views:
+            view.clear_times()
+        self._schedule_refresh()
+
+    def _save_finished_runs(self):
+        self.run_saver.save_runs(self.race.get_finished_runs())
+
+    def _refresh_display(self, changed_runner=None):
+        current_time = perf_counter_ns()
+        for runner, view in enumerate(self.segments_views):
+            view.refresh(runner == changed_runner, current_time)
+        self._schedule_refresh(current_time)
+
+    def _schedule_refresh(self, current_time=None):
+        current_time = perf_counter_ns() if current_time is None else current_time
+        time_until_change = min((time for time in (view.get_time_until_display_change(timer_precision, current_time)
+                                                   for view in self.segments_views) if time is not None), default=None)
+        if time_until_change is None or not self.isVisible() or self.isMinimized():
+            self.refresh_timer.stop()
+            return
+
+        if 10**-timer_precision < refresh_delay:
+            time_until_change = max(time_until_change, refresh_delay)
+        self.refresh_timer.start(math.ceil(time_until_change*1e3))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._refresh_display()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QtCore.QEvent.WindowStateChange:
+            if self.isMinimized():
+                self.refresh_timer.stop()
+            else:
+                self._refresh_display()
+
+    def _process_inputs(self):
+        for event in self.input_queue.drain():
+            action, _, runner = event.action.partition(" ")
+            if action == "split" and runner.isdigit():
+                self.split(int(runner), event.timestamp)
+            elif action == "undo" and runner.isdigit():
+                self.undo_split(int(runner))
+            elif action == "start":
+                self.start(event.timestamp)
+            elif event.action in self.actions:
+                self.actions[event.action]()
+            else:
+                warnings.warn(f'Unknown input action "{event.action}".')
+
+    def closeEvent(self, event=None):
+        if self.input_backend is not None:
+            self.input_backend.stop()
+        self.persistence_worker.stop()
+        self.close()
+
+    def keyPressEvent(self, event):
+        timestamp = self.key_timestamper.pop_timestamp(event)
+        if event.key() in self.split_keys:
+            self.split(self.split_keys[event.key()], timestamp)
+        elif event.key() == race_keymaps["start"]:
+            self.start(timestamp)
+        elif event.key() in self.key_action:
+            self.key_action[event.key()]()
+        event.accept()
+
+
+def launch_race_window(args):
+    parser = argparse.ArgumentParser(description="Times the runners of a race in one window.")
+    parser.add_argument(metavar="records file", dest="records_files", nargs="+",
+                        help="Records file of each runner, in split key order")
+    parser.add_argument("-n", metavar="runner names", dest="runner_names", nargs="+")
+    arguments = parser.parse_args(args[1:])
+
+    app = QtWidgets.QApplication(args)
+    try:
+        runner_records = [SpeedrunRecords.load_from_file(file_name) for file_name in arguments.records_files]
+    except InvalidRecordsError as error:
+        display_error_dialog(error.message)
+        return
+    if arguments.runner_names is not None and len(arguments.runner_names) != len(runner_records):
+        parser.error("One runner name is required per records file.")
+
+    window = RaceWindow(runner_records, arguments.runner_names, input_backend=get_input_backend())
+    window.show()
+    app.exec_()
+
+
+if __name__ == "__main__":
+    launch_race_window(sys.argv)
@@ -0,0 +1,59 @@
+import warnings
+from PyQt5 import QtCore
+
+from pysplitter.core.backends import database_backends
+from pysplitter.core.persistence import PersistenceWorker
+from pysplitter.ui.utils import ask_yes_no_dialog, display_error_dialog
+from pysplitter.config import database_directory, database_backend, use_database, ask_update_database
+
+
+class RunSaver(QtCore.QObject):
+    # Saves the finished runs of a window: times are added to the database and
+    # new records written to their file, on the persistence worker. Records
+    # are marked up to date once their file is written.
+    # Emitted from the persistence worker with the records and the write error (or None)
+    records_written = QtCore.pyqtSignal(object, object)
+
+    def __init__(self, window, persistence_worker: PersistenceWorker):
+        super().__init__(window)
+        self.window = window
+        self.persistence_worker = persistence_worker
+        self.records_written.connect(self._on_records_written)
+
+    # runs are (records, segment_times, final_time) tuples
+    def save_runs(self, runs):
+        if use_database and runs:
+            if not ask_update_database or ask_yes_no_dialog(self.window, "Add times in the database?"):
+                for records, segment_times, final_time in runs:
+                    self.persistence_worker.submit(
+                            database_backends[database_backend].update_database,
+                            database_directory, records.name, dict(segment_times), final_time
+                    )
+
+        new_records = [(records, segment_times, final_time) for records, segment_times, final_time in runs
+                            if records.has_new_records(segment_times, final_time)]
+        if not new_records:
+            return
+        question = "Write new record splits?" if len(runs) == 1 \
+                        else f"Write new record splits of {len(new_records)} runner(s)?"
+        if not ask_yes_no_dialog(self.window, question):
+            return
+
+        for records, segment_times, final_time in new_records:
+            records.update_times(segment_times, final_time)
+            self.write_records(records)
+
+    def write_records(self, records):
+        if records.file_name is None:
+            warnings.warn(f'Couldn\'t update records file of "{records.name}": path set to None.')
+            return
+        self.persistence_worker.write_file(
+                records.file_name, records.dumps(),
+                lambda error: self.records_written.emit(records, error)
+        )
+
+    def _on_records_written(self, records, error):
+        # Until written, the records are still to be saved
+        records.records_file_up_to_date = error is None
+        if error is not None:
+            display_error_dialog(f'Couldn\'t write records file "{records.file_name}": {error}')
@@ -1,38 +1,17 @@
-import warnings
-
+import math
+from time import perf_counter_ns
 from PyQt5 import QtCore, QtWidgets, QtGui
-from matplotlib.colors import LinearSegmentedColormap
 
 from pysplitter.config import (
-        timer_precision, time_loss_color, time_gain_color,
-        worst_time_loss, best_time_gain, best_split_color,
+        timer_precision, time_loss_color, time_gain_color, color_bins,
+        worst_time_loss, best_time_gain, best_split_color, max_visible_segments, show_run_predictions,
         odd_row_text_color, odd_row_bg_color, even_row_text_color, even_row_bg_color,
 )
 from pysplitter.core.splitter import TimeInformation
 
 
-def get_title_label(text)->QtWidgets.QLabel:
-    label = QtWidgets.QLabel(text)
-    label.setFont(QtGui.QFont('Arial', 18))
-    label.setStyleSheet("QLabel { color : #f2f2f2; background-color: #292929; }")
-    label.setAlignment(QtCore.Qt.AlignCenter)
-    label.setMaximumHeight(50)
-    label.setMinimumHeight(25)
-    label.setMinimumWidth(75)
-    return label
-
-def get_segment_label(text)->QtWidgets.QLabel:
-    label = QtWidgets.QLabel(text)
-    label.setFont(QtGui.QFont('Arial', 16))
-    label.setMinimumHeight(30)
-    label.setMaximumHeight(30)
-    label.setMinimumWidth(50)
-    return label
-
-def get_time_label(text)->QtWidgets.QLabel:
-    label = get_segment_label(text)
-    label.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignVCenter)
-    return label
+title_text_color = "#f2f2f2"
+title_bg_color = "#292929"
 
 
 def clip_at_unity(x):
@@ -43,26 +22,54 @@ def clip_at_unity(x):
     return x
 
 
-class SegmentsLayout(QtWidgets.QGridLayout):
-    EMPTY_TIME = "-  "
-    color_bins = 60
-    time_loss_cmap = LinearSegmentedColormap.from_list("delta_cmap", ["gray", time_loss_color], N=color_bins)
-    time_gain_cmap = LinearSegmentedColormap.from_list("delta_cmap", ["gray", time_gain_color], N=color_bins)
-
-    def __init__(self, segment_names, get_splitter, get_records):
-        super().__init__()
-        self.setSpacing(0)
-
+def get_color_gradient(start_color, end_color, bins)->list[str]:
+    start_rgb = QtGui.QColor(start_color).getRgbF()[:3]
+    end_rgb = QtGui.QColor(end_color).getRgbF()[:3]
+    return [
+            "#" + "".join(f"{int(255*(start + (end-start)*i/(bins-1))):02x}" for start, end in zip(start_rgb, end_rgb))
+            for i in range(bins)
+        ]
+
+
+class SegmentsView(QtWidgets.QWidget):
+    EMPTY_TIME = "-"
+    title_height = 35
+    row_height = 30
+    text_margin = 6
+    column_stretches = (2, 1, 1)
+    # Rows below the segments, the total time being last
+    PREDICTED_TIME, SUM_OF_BEST, POSSIBLE_TIME_SAVE, TOTAL_TIME = "Predicted time", "Sum of best", "Possible save", "Total time"
+    time_loss_colors = get_color_gradient("gray", time_loss_color, color_bins)
+    time_gain_colors = get_color_gradient("gray", time_gain_color, color_bins)
+    colors = {
+            color: QtGui.QColor(color)
+            for color in [title_text_color, title_bg_color, best_split_color,
+                          odd_row_text_color, odd_row_bg_color, even_row_text_color, even_row_bg_color,
+                          *time_loss_colors, *time_gain_colors]
+        }
+
+    def __init__(self, segment_names, get_splitter, get_records, parent=None, max_visible_rows=max_visible_segments,
+                 show_predictions=show_run_predictions):
+        super().__init__(parent)
         self._get_splitter = get_splitter
         self._get_records = get_records
+        self.max_visible_rows = max_visible_rows
+        self.footer_labels = [self.PREDICTED_TIME, self.SUM_OF_BEST, self.POSSIBLE_TIME_SAVE, self.TOTAL_TIME] \
+                                if show_predictions else [self.TOTAL_TIME]
+
+        self._title_font = QtGui.QFont('Arial', 18)
+        self._row_font = QtGui.QFont('Arial', 16)
 
-        self.rows = 0
-        self.cols = 3
+        self._scrollbar = QtWidgets.QScrollBar(QtCore.Qt.Vertical, self)
+        self._scrollbar.valueChanged.connect(lambda _: self.update())
 
-        self._add_segment_row("Segment", "Time", "Delta", is_title=True)
-        for i in range(1, self.rows):
-            self._add_segment_row(segment_names[i-1], self.EMPTY_TIME, self.EMPTY_TIME)
-        self._add_segment_row("Total time", self.EMPTY_TIME, "")
+        # Rows are painted from these arrays, only changed rows are repainted
+        self._segment_names = []
+        self._times = []
+        self._deltas = []
+        self._delta_colors = []
+        self._footer_texts = {label: self.EMPTY_TIME for label in self.footer_labels}
+        self.set_segments_names(segment_names)
 
     @property
     def splitter(self):
@@ -72,84 +79,142 @@ class SegmentsLayout(QtWidgets.QGridLayout):
     def records(self):
         return self._get_records()
 
-    def refresh(self, segment_changed=False):
+    @property
+    def visible_rows(self)->int:
+        return max(1, (self.height()-self.title_height)//self.row_height - len(self.footer_labels))
+
+    @property
+    def first_visible_row(self)->int:
+        return self._scrollbar.value()
+
+    def sizeHint(self):
+        shown_rows = min(len(self._segment_names), self.max_visible_rows) + len(self.footer_labels)
+        return QtCore.QSize(400, self.title_height + shown_rows*self.row_height)
+
+    def minimumSizeHint(self):
+        return QtCore.QSize(200, self.title_height + (1+len(self.footer_labels))*self.row_height)
+
+    # current_time (from perf_counter_ns) is read from the clock when not given
+    def refresh(self, segment_changed=False, current_time=None):
         segment_index = self.splitter.get_current_segment_index()
 
         if segment_changed and segment_index > 0:
             previous_segment_time = self._get_time(TimeInformation.PREVIOUS_SEGMENT)
-            self._set_time(segment_index, 1, previous_segment_time)
+            self._set_time(segment_index-1, previous_segment_time)
             self._set_delta(previous_segment_time, segment_index-1)
+            self._scroll_to_segment(segment_index)
+
+        if segment_index < 0:
+            return
 
-        if 0 <= segment_index < len(self.records.segment_names):
-            current_split = self._get_time(TimeInformation.CURRENT_SEGMENT)
-            self._set_time(segment_index+1, 1, current_split)
-            self._set_time(self.rows-1, 1, self._get_time(TimeInformation.CURRENT_TOTAL_TIME))
+        if current_time is None:
+            current_time = perf_counter_ns()
+        total_time = self._get_time(TimeInformation.CURRENT_TOTAL_TIME, current_time)
+        self._set_footer_time(self.TOTAL_TIME, total_time)
 
-            if self.records.pb is not None:
-                if segment_index < len(self.records.best_splits) and current_split >= self.records.best_splits[segment_index]:
+        current_split = self._get_time(TimeInformation.CURRENT_SEGMENT, current_time)
+        if segment_index < len(self.records.segment_names):
+            self._set_time(segment_index, current_split)
+
+            # The ongoing delta is shown once the best split is exceeded, or at once when unknown
+            if self.records.pb is not None and segment_index < len(self.records.best_splits):
+                best_split = self.records.best_splits[segment_index]
+                if math.isnan(best_split) or current_split >= best_split:
                     self._set_delta(current_split, segment_index)
 
-    def _set_time(self, segment_index, column, time):
-        self.itemAtPosition(segment_index, column).widget().setText( self._get_formatted_time(time) )
+        self._refresh_predictions(segment_index, total_time-current_split, current_split)
 
-    def _get_time(self, time_type: TimeInformation):
-        return self.splitter.get_time(time_type)
+    def get_time_until_display_change(self, precision, current_time=None):
+        # Besides the two clocks, the delta and prediction rows follow the
+        # current segment time offset by the records
+        segment_index = self.splitter.get_current_segment_index()
+        if self.records is None or not 0 <= segment_index < len(self.records.segment_names):
+            return self.splitter.get_time_until_display_change(precision, current_time)
+
+        if current_time is None:
+            current_time = perf_counter_ns()
+        current_split = self._get_time(TimeInformation.CURRENT_SEGMENT, current_time)
+        completed_time = self._get_time(TimeInformation.CURRENT_TOTAL_TIME, current_time) - current_split
+        pb_split = self.records.pb_splits[segment_index]
+        best_split = self.records.best_splits[segment_index]
+        offsets, thresholds = [], [best_split, pb_split]
+
+        if self.records.pb is not None and not math.isnan(pb_split) \
+                and (math.isnan(best_split) or current_split >= best_split):
+            offsets.append(-pb_split)
+
+        if self.PREDICTED_TIME in self._footer_texts:
+            remaining_pb = self.records.get_suffix_sum("pb_splits", segment_index+1)
+            remaining_best = self.records.get_suffix_sum("best_splits", segment_index+1)
+            if remaining_pb is not None and current_split >= pb_split:
+                offsets.append(completed_time + remaining_pb)
+            if remaining_pb is not None and remaining_best is not None and best_split <= current_split < pb_split:
+                # The possible save decreases as the segment time increases
+                offsets.append(-(pb_split + remaining_pb - remaining_best))
+
+        return self.splitter.get_time_until_display_change(
+                precision, current_time,
+                segment_offsets=offsets,
+                segment_thresholds=[threshold for threshold in thresholds if not math.isnan(threshold)]
+            )
 
     def erase_current_split(self):
         current_segment = self.splitter.get_current_segment_index()
-        if current_segment > 0:
-            self._erase_row(current_segment+1)
-            self._set_row_color(current_segment+1)
-
+        if current_segment >= len(self._segment_names):
+            # Run ended: the final split is on the total time row
+            self._set_footer_time(self.TOTAL_TIME, None)
+            self._scroll_to_segment(len(self._segment_names)-1)
+        elif current_segment > 0:
+            self._erase_row(current_segment)
+            self._scroll_to_segment(current_segment-1)
 
     def clear_times(self):
-        for i in range(1, self.rows):
-            self._erase_row(i)
-            if i < self.rows-1:
-                self._set_row_color(i)
+        for row in range(len(self._segment_names)):
+            self._erase_row(row)
+        self._set_footer_time(self.TOTAL_TIME, None)
+        self._refresh_predictions()
+        self._scrollbar.setValue(0)
 
     def set_segments_names(self, segment_names: list[str]):
-        segments_number = len(segment_names)
-        row_number = max([segments_number+1, self.rows])
-
-        for i in range(1, row_number):
-            if i < segments_number+1:
-                if i < self.rows:
-                    self._set_row_segment_name(" "+segment_names[i-1], i)
-                else:
-                    self._add_segment_row(segment_names[i-1], self.EMPTY_TIME, self.EMPTY_TIME)
-            else:
-                self._set_row_segment_name("", i)
-            self._set_row_color(i)
-
-        for i in reversed(range(segments_number+1, row_number)):
-            self._remove_segment_row(i)
-        self._add_segment_row("Total time", self.EMPTY_TIME, "")
+        self._segment_names = list(segment_names)
+        self._times = [self.EMPTY_TIME]*len(segment_names)
+        self._deltas = [self.EMPTY_TIME]*len(segment_names)
+        self._delta_colors = [None]*len(segment_names)
+        self._footer_texts = {label: self.EMPTY_TIME for label in self.footer_labels}
+        self._refresh_predictions()
+
+        self._update_scrollbar()
+        self._scrollbar.setValue(0)
+        self.updateGeometry()
+        self.update()
+
+    def _get_time(self, time_type: TimeInformation, current_time=None):
+        return self.splitter.get_time(time_type, current_time)
+
+    def _set_time(self, segment_index, time):
+        text = self._get_formatted_time(time)
+        if self._times[segment_index] != text:
+            self._times[segment_index] = text
+            self._update_row(segment_index)
+
+    def _set_footer_time(self, label, time):
+        if label not in self._footer_texts:
+            return
 
-    def _add_segment_row(self, *cols: str, is_title=False):
-        assert(len(cols) == self.cols)
+        text = self.EMPTY_TIME if time is None else self._get_formatted_time(time)
+        if self._footer_texts[label] != text:
+            self._footer_texts[label] = text
+            self.update(self._get_footer_row_rect(self.footer_labels.index(label)))
 
-        for col, element in enumerate(cols):
-            if is_title:
-                label = get_title_label(element)
-            else:
-                if col == 0:
-                    label = get_segment_label(" "+element)
-                else:
-                    label = get_time_label(element)
-            self.addWidget(label, self.rows, col)
-        self.rows += 1
-
-    def _remove_segment_row(self, row):
-        if row <= 0 or row >= self.rows:
-            warnings.warn("No row removed in segments layout.")
+    def _refresh_predictions(self, segment_index=0, completed_time=0., current_split=0.):
+        # Constant time per refresh: the records cache the sums of splits
+        if self.PREDICTED_TIME not in self._footer_texts or self.records is None:
             return
-        for col in range(self.cols):
-            widget = self.itemAtPosition(row, col).widget()
-            self.removeWidget(widget)
-            if widget is not None:
-                widget.deleteLater()
-        self.rows -= 1
+
+        self._set_footer_time(self.PREDICTED_TIME,
+                              self.records.get_predicted_final_time(segment_index, completed_time, current_split))
+        self._set_footer_time(self.SUM_OF_BEST, self.records.get_sum_of_best())
+        self._set_footer_time(self.POSSIBLE_TIME_SAVE, self.records.get_possible_time_save(segment_index, current_split))
 
     def _get_formatted_time(self, time):
         hours, rem = divmod(round(time, timer_precision), 3600)
@@ -161,7 +226,7 @@ class SegmentsLayout(QtWidgets.QGridLayout):
         return f"{secs:.{timer_precision}f}s"
 
     def _set_delta(self, split, segment_index):
-        if self.records.pb_splits[segment_index] is None:
+        if math.isnan(self.records.pb_splits[segment_index]):
             return
 
         pb_time, best_split = self.records.pb_splits[segment_index], self.records.best_splits[segment_index]
@@ -171,36 +236,123 @@ class SegmentsLayout(QtWidgets.QGridLayout):
             text_color = best_split_color
         else:
             if delta <= 0:
-                colormap = self.time_gain_cmap
+                colors = self.time_gain_colors
                 split_deviance_intensity = clip_at_unity(-delta/best_time_gain)
             else:
-                colormap = self.time_loss_cmap
+                colors = self.time_loss_colors
                 split_deviance_intensity = clip_at_unity(delta/worst_time_loss)
 
-            color = colormap( split_deviance_intensity+.5 )
-            text_color = "rgb(" + ",".join(list(map(lambda x: str(int(255*x)), color[:-1]))) + ")"
+            # The gradient starts halfway so that small deltas are still colored
+            text_color = colors[ min(int((split_deviance_intensity+.5)*color_bins), color_bins-1) ]
 
-        self.itemAtPosition(segment_index+1, 2).widget().setText( f'{delta:+.{timer_precision}f}')
-        self._set_element_color(segment_index+1, 2, textcolor=text_color)
+        text = f'{delta:+.{timer_precision}f}'
+        if self._deltas[segment_index] != text or self._delta_colors[segment_index] != text_color:
+            self._deltas[segment_index] = text
+            self._delta_colors[segment_index] = text_color
+            self._update_row(segment_index)
 
     def _erase_row(self, row):
-        for col in range(1, self.cols):
-            self.itemAtPosition(row, col).widget().setText(self.EMPTY_TIME)
-
-    def _set_row_segment_name(self, segment_name: str, row):
-        self.itemAtPosition(row, 0).widget().setText(segment_name)
-
-    def _set_row_color(self, row, *args, **kwargs):
-        for col in range(self.cols):
-            self._set_element_color(row, col, *args, **kwargs)
-
-    def _set_element_color(self, row, col, textcolor=None, background=None):
-        _textcolor, _background = textcolor, background
-        if textcolor is None:
-            _textcolor = odd_row_text_color if row%2==1 else even_row_text_color
-        if background is None:
-            _background = odd_row_bg_color if row%2==1 else even_row_bg_color
-
-        self.itemAtPosition(row, col).widget()\
-                .setStyleSheet("QLabel { color : " + _textcolor + ";"
-                               + "background-color: " + _background+"; }")
+        if self._times[row] != self.EMPTY_TIME or self._deltas[row] != self.EMPTY_TIME:
+            self._times[row] = self.EMPTY_TIME
+            self._deltas[row] = self.EMPTY_TIME
+            self._delta_colors[row] = None
+            self._update_row(row)
+
+    def _scroll_to_segment(self, segment_index):
+        # Keeps the next segment in view when possible
+        if segment_index < self.first_visible_row:
+            self._scrollbar.setValue(segment_index)
+        elif segment_index+1 >= self.first_visible_row+self.visible_rows:
+            self._scrollbar.setValue(segment_index+2-self.visible_rows)
+
+    def _update_scrollbar(self):
+        hidden_rows = max(0, len(self._segment_names)-self.visible_rows)
+        self._scrollbar.setRange(0, hidden_rows)
+        self._scrollbar.setPageStep(self.visible_rows)
+        self._scrollbar.setVisible(hidden_rows > 0)
+
+    def _update_row(self, segment_index):
+        row = segment_index-self.first_visible_row
+        if 0 <= row < self.visible_rows:
+            self.update(self._get_row_rect(row))
+
+    def _get_table_width(self)->int:
+        return self.width() - (self._scrollbar.sizeHint().width() if self._scrollbar.isVisible() else 0)
+
+    def _get_row_rect(self, row)->QtCore.QRect:
+        return QtCore.QRect(0, self.title_height+row*self.row_height, self._get_table_width(), self.row_height)
+
+    def _get_footer_row_rect(self, footer_row)->QtCore.QRect:
+        return QtCore.QRect(0, self.height()-(len(self.footer_labels)-footer_row)*self.row_height,
+                            self.width(), self.row_height)
+
+    def _get_column_rects(self, row_rect):
+        rects = []
+        left, total_stretch = row_rect.left(), sum(self.column_stretches)
+        for stretch in self.column_stretches:
+            width = row_rect.width()*stretch//total_stretch
+            rects.append(QtCore.QRect(left, row_rect.top(), width, row_rect.height()))
+            left += width
+        return rects
+
+    def _get_row_colors(self, segment_index):
+        if segment_index%2 == 0:
+            return odd_row_text_color, odd_row_bg_color
+        return even_row_text_color, even_row_bg_color
+
+    def _paint_cells(self, painter, row_rect, texts, text_colors, background):
+        painter.fillRect(row_rect, self.colors[background])
+        alignments = (QtCore.Qt.AlignLeft, QtCore.Qt.AlignRight, QtCore.Qt.AlignRight)
+        for rect, text, text_color, alignment in zip(self._get_column_rects(row_rect), texts, text_colors, alignments):
+            rect = rect.adjusted(self.text_margin, 0, -self.text_margin, 0)
+            text = painter.fontMetrics().elidedText(text, QtCore.Qt.ElideRight, rect.width())
+            color = self.colors.get(text_color)
+            painter.setPen(color if color is not None else QtGui.QColor(text_color))
+            painter.drawText(rect, alignment|QtCore.Qt.AlignVCenter, text)
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        table_width = self._get_table_width()
+
+        title_rect = QtCore.QRect(0, 0, self.width(), self.title_height)
+        if event.rect().intersects(title_rect):
+            painter.setFont(self._title_font)
+            painter.fillRect(title_rect, self.colors[title_bg_color])
+            painter.setPen(self.colors[title_text_color])
+            for rect, text in zip(self._get_column_rects(QtCore.QRect(0, 0, table_width, self.title_height)),
+                                  ("Segment", "Time", "Delta")):
+                painter.drawText(rect, QtCore.Qt.AlignCenter, text)
+
+        painter.setFont(self._row_font)
+        last_row = min(len(self._segment_names), self.first_visible_row+self.visible_rows)
+        for row, segment_index in enumerate(range(self.first_visible_row, last_row)):
+            row_rect = self._get_row_rect(row)
+            if not event.rect().intersects(row_rect):
+                continue
+            text_color, background = self._get_row_colors(segment_index)
+            delta_color = self._delta_colors[segment_index] or text_color
+            self._paint_cells(painter, row_rect,
+                              (self._segment_names[segment_index], self._times[segment_index], self._deltas[segment_index]),
+                              (text_color, text_color, delta_color), background)
+
+        filled_height = self.title_height + (last_row-self.first_visible_row)*self.row_height
+        painter.fillRect(QtCore.QRect(0, filled_height, table_width, self.height()-filled_height), self.colors[title_bg_color])
+
+        for footer_row, label in enumerate(self.footer_labels):
+            row_rect = self._get_footer_row_rect(footer_row)
+            if not event.rect().intersects(row_rect):
+                continue
+            text_color, background = self._get_row_colors(len(self._segment_names)+footer_row)
+            self._paint_cells(painter, row_rect, (label, self._footer_texts[label], ""),
+                              (text_color, text_color, text_color), background)
+
+    def resizeEvent(self, event):
+        scrollbar_width = self._scrollbar.sizeHint().width()
+        self._scrollbar.setGeometry(self.width()-scrollbar_width, self.title_height,
+                                    scrollbar_width, self.visible_rows*self.row_height)
+        self._update_scrollbar()
+        super().resizeEvent(event)
+
+    def wheelEvent(self, event):
+        self._scrollbar.setValue(self.first_visible_row - event.angleDelta().y()//120)
+        event.accept()
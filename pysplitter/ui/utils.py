@@ -1,4 +1,5 @@
-from PyQt5 import QtWidgets
+from time import perf_counter_ns
+from PyQt5 import QtCore, QtWidgets
 qmessage = QtWidgets.QMessageBox
 
 
@@ -13,3 +14,39 @@ def ask_yes_no_dialog(parent, message) -> bool:
     return qmessage.question(
             parent, '', message, qmessage.Yes | qmessage.No
         ) == qmessage.Yes
+
+
+class KeyPressTimestamper(QtCore.QObject):
+    # Installed on the application, it sees key presses before they are
+    # dispatched to widgets and records when they were received. The stamp
+    # belongs to the key press being dispatched only: it is replaced by the next
+    # press and dropped once back in the event loop, so that a press consumed
+    # by another widget (e.g. a dialog) doesn't leave a stale stamp.
+    def __init__(self, keys):
+        super().__init__()
+        self._keys = set(keys)
+        self._stamp = None
+
+    @staticmethod
+    def _get_event_identity(event):
+        return event.key(), event.timestamp()
+
+    def eventFilter(self, watched, event):
+        if event.type() == QtCore.QEvent.KeyPress and event.key() in self._keys:
+            # The filter is called again when the event propagates to parent widgets
+            identity = self._get_event_identity(event)
+            if self._stamp is None or self._stamp[0] != identity:
+                stamp = self._stamp = identity, perf_counter_ns()
+                QtCore.QTimer.singleShot(0, lambda: self._drop_stamp(stamp))
+        return False
+
+    def _drop_stamp(self, stamp):
+        if self._stamp is stamp:
+            self._stamp = None
+
+    def pop_timestamp(self, event):
+        if self._stamp is None or self._stamp[0] != self._get_event_identity(event):
+            return None
+        _, timestamp = self._stamp
+        self._stamp = None
+        return timestamp
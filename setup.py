@@ -1,11 +1,20 @@
-from setuptools import setup
+from setuptools import setup, find_packages
 
 setup(
     name='pysplitter',
     author='simon lizotte',
     version='0.0.1',
-    packages=['pysplitter'],
+    packages=find_packages(include=['pysplitter', 'pysplitter.*']),
     install_requires=[
         'pyqt5'
     ],
+    extras_require={
+        'fast-json': ['orjson'],
+        'stats': ['numpy', 'matplotlib', 'pandas'],
+    },
+    entry_points={
+        'console_scripts': [
+            'pysplitter-stats=pysplitter.display_stats:main',
+        ],
+    },
 )
@@ -0,0 +1,6 @@
+import sys, pathlib
+
+abolute_path_to_file = pathlib.Path(__file__).parent.resolve()
+sys.path.append(f"{abolute_path_to_file}")
+from pysplitter.ui.race import launch_race_window
+launch_race_window(sys.argv)
@@ -0,0 +1,103 @@
+from pysplitter.core import database, columnar
+from pysplitter.core.database import update_database, load_database, compact_database
+from array import array
+import math
+import os
+import pytest
+
+
+speedrun_name = "test_run"
+runs = [
+        ({"a": 1.5, "b": 2.0, "c": 3.25}, 6.75),
+        ({"a": 1.25, "b": None, "c": None}, None),
+        ({"a": 1.0, "b": 2.5, "c": 3.0}, 6.5),
+    ]
+
+
+def add_runs(database_dir):
+    for segment_times, final_time in runs:
+        update_database(database_dir, speedrun_name, segment_times, final_time)
+
+
+def test_missingdirectory_warns(tmp_path):
+    with pytest.warns(UserWarning):
+        update_database(str(tmp_path/"missing"), speedrun_name, runs[0][0], runs[0][1])
+
+
+def test_load_appended_runs(tmp_path):
+    add_runs(tmp_path)
+    speedrun_data = load_database(tmp_path, speedrun_name)
+
+    assert speedrun_data["a"] == [1.5, 1.25, 1.0]
+    assert speedrun_data["b"] == [2.0, None, 2.5]
+    assert speedrun_data["__final_time"] == [6.75, None, 6.5]
+
+
+def test_compaction_preserves_history(tmp_path):
+    add_runs(tmp_path)
+    before_compaction = load_database(tmp_path, speedrun_name)
+    compact_database(tmp_path, speedrun_name)
+
+    assert not os.path.isfile(tmp_path/(speedrun_name+".journal"))
+    assert load_database(tmp_path, speedrun_name) == before_compaction
+
+
+def test_appends_after_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "minimum_compaction_size", 0)
+    add_runs(tmp_path)
+    add_runs(tmp_path)
+
+    assert load_database(tmp_path, speedrun_name)["a"] == [1.5, 1.25, 1.0]*2
+
+
+def test_corrupted_journal_line_skipped(tmp_path):
+    add_runs(tmp_path)
+    with open(tmp_path/(speedrun_name+".journal"), "a") as file_stream:
+        file_stream.write('{"segment_times": {"a"')
+
+    with pytest.warns(UserWarning):
+        assert load_database(tmp_path, speedrun_name)["a"] == [1.5, 1.25, 1.0]
+
+
+def read_column(database_dir, file_name, typecode="d"):
+    column = array(typecode)
+    with open(os.path.join(columnar.get_store_dir(database_dir, speedrun_name), file_name), "rb") as file_stream:
+        column.frombytes(file_stream.read())
+    return column.tolist()
+
+
+def test_columns_runaligned(tmp_path):
+    add_runs(tmp_path)
+
+    assert columnar.get_row_count(columnar.get_store_dir(tmp_path, speedrun_name)) == len(runs)
+    assert read_column(tmp_path, "segment_0.f64") == [1.5, 1.25, 1.0]
+    assert math.isnan(read_column(tmp_path, "segment_2.f64")[1])
+    final_times = read_column(tmp_path, "final_time.f64")
+    assert final_times[0] == 6.75 and math.isnan(final_times[1]) and final_times[2] == 6.5
+
+
+def test_columns_newsegment_padded(tmp_path):
+    add_runs(tmp_path)
+    update_database(tmp_path, speedrun_name, {"a": 1.0, "d": 4.0}, None)
+
+    new_column = read_column(tmp_path, "segment_3.f64")
+    assert all(math.isnan(time) for time in new_column[:-1]) and new_column[-1] == 4.0
+    assert math.isnan(read_column(tmp_path, "segment_1.f64")[-1])
+
+
+def test_columns_rebuilt_from_history(tmp_path):
+    add_runs(tmp_path)
+    columnar.rebuild_store(tmp_path, speedrun_name, database.get_aligned_runs(load_database(tmp_path, speedrun_name)))
+
+    assert read_column(tmp_path, "segment_1.f64")[0] == 2.0
+    assert read_column(tmp_path, "timestamp.i64", "q") == [columnar.unknown_timestamp]*len(runs)
+
+
+def test_columns_memorymapped(tmp_path):
+    np = pytest.importorskip("numpy")
+    add_runs(tmp_path)
+    columns = columnar.load_columns(tmp_path, speedrun_name)
+
+    assert isinstance(columns["a"], np.memmap)
+    assert np.nanmean(columns["c"]) == pytest.approx(3.125)
+    assert np.count_nonzero(np.isnan(columns["__final_time"])) == 1
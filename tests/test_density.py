@@ -0,0 +1,36 @@
+from pysplitter.core.density import estimate_densities
+import numpy as np
+import pytest
+
+
+def get_samples():
+    rng = np.random.default_rng(0)
+    return [
+            rng.normal(10, 1, 500),
+            np.concatenate([rng.normal(5, 0.3, 300), rng.normal(8, 0.5, 100)]),
+            rng.lognormal(3, 0.5, 2000),
+        ]
+
+
+def test_densities_match_gaussian_kde():
+    gaussian_kde = pytest.importorskip("scipy.stats").gaussian_kde
+    samples = get_samples()
+    points, densities = estimate_densities(samples, bandwidth_factor=0.5)
+
+    for segment_samples, segment_points, density in zip(samples, points, densities):
+        assert segment_points[0] == segment_samples.min() and segment_points[-1] == pytest.approx(segment_samples.max())
+        reference = gaussian_kde(segment_samples, bw_method=0.5).evaluate(segment_points)
+        assert np.max(np.abs(density-reference)) < 1e-4*np.max(reference)
+
+
+def test_densities_shape():
+    points, densities = estimate_densities(get_samples(), point_number=50)
+    assert points.shape == densities.shape == (3, 50)
+
+
+def test_degenerate_segments_have_no_density():
+    points, densities = estimate_densities([[1., 1., 1.], [2.], np.arange(10.)])
+
+    assert np.all(np.isnan(densities[:2]))
+    assert np.all(points[0] == 1.) and np.all(points[1] == 2.)
+    assert np.all(np.isfinite(densities[2]))
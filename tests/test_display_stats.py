@@ -0,0 +1,86 @@
+import os
+import io
+import random
+import pytest
+
+pytest.importorskip("matplotlib")
+pytest.importorskip("pandas")
+
+from pysplitter import display_stats
+from pysplitter.core import cache, sqlite_database
+from pysplitter.core.database import append_runs_to_database, update_database
+
+
+def add_history(database_dir, speedrun_name, run_number=50):
+    random.seed(speedrun_name)
+    append_runs_to_database(database_dir, speedrun_name, [
+            ({"a": random.gauss(10, 1), "b": random.gauss(20, 2)}, random.gauss(30, 3), 0)
+            for i in range(run_number)
+        ])
+
+
+def test_statistics_of_segments(tmp_path):
+    add_history(str(tmp_path), "run")
+    speedrun_data = display_stats.load_speedrun_data(str(tmp_path), "run")
+    segments_data = display_stats.get_segments_statistics(speedrun_data, ["a", "b", "missing"], {}, "name", io.StringIO())
+
+    assert list(segments_data.index) == ["b", "a", "__final_time"]
+    assert segments_data.loc["a", "points"].shape == segments_data.loc["a", "density"].shape
+
+
+def test_no_statistics_without_data(tmp_path):
+    assert display_stats.get_segments_statistics({"a": [1.]}, ["a"], {}, stream=io.StringIO()) is None
+
+
+def test_reports_of_every_speedrun(tmp_path):
+    database_dir = str(tmp_path/"database")
+    os.mkdir(database_dir)
+    add_history(database_dir, "first run")
+    add_history(database_dir, "second run")
+
+    file_names = display_stats.write_reports(database_dir, str(tmp_path/"reports"), ["png", "svg"], process_number=2)
+    assert sorted(os.path.basename(file_name) for file_name in file_names) == [
+            "first run.png", "first run.svg", "first run.txt",
+            "second run.png", "second run.svg", "second run.txt",
+        ]
+    with open(tmp_path/"reports"/"first run.txt") as stream:
+        assert "Most consistent:" in stream.read()
+
+
+def test_cached_statistics(tmp_path, monkeypatch):
+    add_history(str(tmp_path), "run")
+    segments_data = display_stats.load_segments_statistics(str(tmp_path), "run", stream=io.StringIO())
+
+    def fail_loading(*args):
+        raise AssertionError("History loaded despite cached statistics.")
+    monkeypatch.setattr(display_stats, "load_speedrun_data", fail_loading)
+    cached_segments_data = display_stats.load_segments_statistics(str(tmp_path), "run", stream=io.StringIO())
+
+    assert list(cached_segments_data.index) == list(segments_data.index)
+    for column in display_stats.statistics_columns + ["points", "density"]:
+        for cached_value, value in zip(cached_segments_data[column], segments_data[column]):
+            assert (cached_value == value).all() if hasattr(value, "all") else cached_value == value
+
+
+def test_cache_invalidated_by_database_update(tmp_path):
+    add_history(str(tmp_path), "run")
+    segments_data = display_stats.load_segments_statistics(str(tmp_path), "run", stream=io.StringIO())
+    assert os.listdir(cache.get_cache_dir(str(tmp_path), "run"))
+
+    update_database(str(tmp_path), "run", {"a": 100., "b": 20.}, 120.)
+    assert not os.path.exists(cache.get_cache_dir(str(tmp_path), "run"))
+    updated_segments_data = display_stats.load_segments_statistics(str(tmp_path), "run", stream=io.StringIO())
+    assert updated_segments_data.loc["a", "max"] == 100. != segments_data.loc["a", "max"]
+
+
+def test_statistics_of_sqlite_database(tmp_path):
+    random.seed("run")
+    sqlite_database.append_runs_to_database(str(tmp_path), "run", [
+            ({"a": random.gauss(10, 1), "b": random.gauss(20, 2)}, random.gauss(30, 3), 0) for i in range(50)
+        ])
+    segments_data = display_stats.load_segments_statistics(str(tmp_path), "run", stream=io.StringIO(), backend="sqlite")
+    assert sorted(segments_data.index) == ["__final_time", "a", "b"]
+    assert display_stats.load_segments_statistics(str(tmp_path), "run", stream=io.StringIO(), backend="json") is None
+
+    file_names = display_stats.write_reports(str(tmp_path), str(tmp_path/"reports"), process_number=1, backend="sqlite")
+    assert sorted(os.path.basename(file_name) for file_name in file_names) == ["run.png", "run.txt"]
@@ -0,0 +1,62 @@
+from pysplitter.core import export, columnar
+from pysplitter.core.database import update_database
+import csv
+import numpy as np
+import pytest
+
+
+speedrun_name = "test_run"
+runs = [
+        ({"a": 1.5, "b": 2.0}, 3.5),
+        ({"a": 1.25, "b": None}, None),
+        ({"a": 1.0, "b": 2.5, "c": 3.0}, None),
+    ]
+
+
+@pytest.fixture
+def database_dir(tmp_path):
+    database_dir = tmp_path/"database"
+    database_dir.mkdir()
+    for segment_times, final_time in runs:
+        update_database(str(database_dir), speedrun_name, segment_times, final_time)
+    return str(database_dir)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+def test_export_csv(database_dir, tmp_path, chunk_size):
+    file_name = str(tmp_path/"history.csv")
+    export.export_csv(database_dir, speedrun_name, file_name, chunk_size)
+
+    with open(file_name, newline="") as file_stream:
+        rows = list(csv.reader(file_stream))
+    assert rows[0] == ["attempt", "timestamp", "final_time", "a", "b", "c"]
+    assert [row[:1]+row[2:] for row in rows[1:]] == [
+            ["1", "3.5", "1.5", "2.0", ""],
+            ["2", "", "1.25", "", ""],
+            ["3", "", "1.0", "2.5", "3.0"],
+        ]
+    assert all(int(row[1]) > 0 for row in rows[1:])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 1000])
+def test_export_npz(database_dir, tmp_path, chunk_size):
+    file_name = str(tmp_path/"history.npz")
+    export.export_npz(database_dir, speedrun_name, file_name, chunk_size)
+    columns = columnar.load_columns(database_dir, speedrun_name)
+
+    with np.load(file_name) as arrays:
+        assert set(arrays.files) == set(columns)
+        for column, values in columns.items():
+            np.testing.assert_array_equal(arrays[column], values)
+            assert arrays[column].dtype == values.dtype
+
+
+def test_export_all_speedruns(database_dir, tmp_path):
+    update_database(database_dir, "other_run", {"x": 1.0}, 1.0)
+    file_names = export.export_database(database_dir, str(tmp_path/"export"), "npz")
+    assert sorted(file_names) == [str(tmp_path/"export"/"other_run.npz"), str(tmp_path/"export"/"test_run.npz")]
+
+
+def test_export_missing_speedrun_warns(database_dir, tmp_path):
+    with pytest.warns(UserWarning):
+        assert export.export_database(database_dir, str(tmp_path/"export"), speedrun_names=["missing"]) == []
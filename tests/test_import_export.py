@@ -0,0 +1,36 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+from pysplitter.config import keymaps
+from pysplitter.ui.import_export import PySplitButton
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+class Window(QtWidgets.QWidget):
+    def __init__(self):
+        super().__init__()
+        self.pressed_keys = []
+
+    # Like the main window, handles the event without returning anything
+    def keyPressEvent(self, event):
+        self.pressed_keys.append(event.key())
+        event.accept()
+
+
+def test_mapped_key_redirected_from_focused_button(app):
+    window = Window()
+    button = PySplitButton(window, "Load records", window)
+    window.show()
+    button.setFocus()
+
+    event = QtGui.QKeyEvent(QtCore.QEvent.KeyPress, keymaps["split"], QtCore.Qt.NoModifier)
+    assert app.notify(button, event)
+    assert window.pressed_keys == [keymaps["split"]]
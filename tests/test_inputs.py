@@ -0,0 +1,48 @@
+from pysplitter.core.inputs import InputQueue, InputEvent, InputBackend, SyntheticInputBackend
+from pysplitter.core.splitter import Splitter, TimeInformation
+import threading
+import pytest
+
+
+segment_names = ["a", "b", "c"]
+
+
+def test_queue_bounded():
+    queue = InputQueue(max_size=2)
+    for i in range(3):
+        queue.put(InputEvent("split", i))
+
+    assert queue.dropped == 1
+    assert [event.timestamp for event in queue.drain()] == [0, 1]
+    assert len(queue) == 0
+
+
+def test_synthetic_backend_splits():
+    all_events_received = threading.Event()
+
+    def notify():
+        if len(queue) == len(segment_names)+1:
+            all_events_received.set()
+
+    queue = InputQueue(notify=notify)
+    backend = SyntheticInputBackend([(0.01, "split")]*(len(segment_names)+1))
+    backend.start(queue)
+    assert all_events_received.wait(2)
+    backend.stop()
+
+    splitter = Splitter(segment_names)
+    events = queue.drain()
+    for event in events:
+        splitter.split(event.timestamp)
+
+    assert splitter.has_run_ended
+    segment_times, final_time = splitter.get_time(TimeInformation.ALL_SEGMENTS)
+    assert final_time == pytest.approx((events[-1].timestamp - events[0].timestamp)/1e9)
+
+
+def test_incomplete_backend_not_instantiable():
+    class IncompleteBackend(InputBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
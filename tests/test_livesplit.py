@@ -0,0 +1,112 @@
+from pysplitter.core import livesplit, columnar
+from pysplitter.core.database import load_database
+from pysplitter.core.records import SpeedrunRecords
+import pytest
+
+
+splits_file_content = """<?xml version="1.0" encoding="UTF-8"?>
+<Run version="1.7.0">
+  <GameName>Game</GameName>
+  <CategoryName>Any%</CategoryName>
+  <AttemptCount>4</AttemptCount>
+  <AttemptHistory>
+    <Attempt id="1" started="01/02/2020 10:00:00" isStartedSynced="True" ended="01/02/2020 10:01:00" isEndedSynced="True">
+      <RealTime>00:00:06.7500000</RealTime>
+    </Attempt>
+    <Attempt id="2" started="01/02/2020 11:00:00" isStartedSynced="True" ended="01/02/2020 11:00:02" isEndedSynced="True" />
+    <Attempt id="3" started="01/03/2020 10:00:00" isStartedSynced="True" ended="01/03/2020 10:01:00" isEndedSynced="True">
+      <RealTime>00:00:06.5000000</RealTime>
+    </Attempt>
+    <Attempt id="4" started="01/03/2020 11:00:00" isStartedSynced="True" ended="01/03/2020 11:00:01" isEndedSynced="True" />
+  </AttemptHistory>
+  <Segments>
+    <Segment>
+      <Name>a</Name>
+      <SplitTimes>
+        <SplitTime name="Personal Best">
+          <RealTime>00:00:01.0000000</RealTime>
+        </SplitTime>
+      </SplitTimes>
+      <BestSegmentTime>
+        <RealTime>00:00:01.0000000</RealTime>
+      </BestSegmentTime>
+      <SegmentHistory>
+        <Time id="1"><RealTime>00:00:01.5000000</RealTime></Time>
+        <Time id="2"><RealTime>00:00:01.2500000</RealTime></Time>
+        <Time id="3"><RealTime>00:00:01.0000000</RealTime></Time>
+      </SegmentHistory>
+    </Segment>
+    <Segment>
+      <Name>b</Name>
+      <SplitTimes>
+        <SplitTime name="Personal Best">
+          <RealTime>00:00:03.5000000</RealTime>
+        </SplitTime>
+      </SplitTimes>
+      <BestSegmentTime>
+        <RealTime>00:00:02.0000000</RealTime>
+      </BestSegmentTime>
+      <SegmentHistory>
+        <Time id="1"><RealTime>00:00:02.0000000</RealTime></Time>
+        <Time id="3"><RealTime>00:00:02.5000000</RealTime></Time>
+      </SegmentHistory>
+    </Segment>
+    <Segment>
+      <Name>a</Name>
+      <SplitTimes>
+        <SplitTime name="Personal Best">
+          <RealTime>00:00:06.5000000</RealTime>
+        </SplitTime>
+      </SplitTimes>
+      <BestSegmentTime>
+        <RealTime>00:00:03.0000000</RealTime>
+      </BestSegmentTime>
+      <SegmentHistory>
+        <Time id="-1"><RealTime>00:00:02.0000000</RealTime></Time>
+        <Time id="1"><RealTime>00:00:03.2500000</RealTime></Time>
+        <Time id="3"><RealTime>00:00:03.0000000</RealTime></Time>
+      </SegmentHistory>
+    </Segment>
+  </Segments>
+</Run>
+"""
+
+
+@pytest.fixture
+def splits_file(tmp_path):
+    file_name = tmp_path/"splits.lss"
+    file_name.write_text(splits_file_content)
+    return str(file_name)
+
+
+def test_parse_time():
+    assert livesplit.parse_time("00:01:02.5000000") == 62.5
+    assert livesplit.parse_time("1.00:00:01") == 86401
+    assert livesplit.parse_time(None) is None
+    with pytest.warns(UserWarning):
+        assert livesplit.parse_time("invalid") is None
+
+
+def test_records_from_splits_file(splits_file, tmp_path):
+    records = livesplit.import_splits(splits_file, str(tmp_path/"records.json"), str(tmp_path))
+
+    assert records.name == "Game - Any%"
+    assert records.segment_names == ["a", "b", "a (2)"]
+    assert records.pb == 6.5
+    assert records.pb_splits.tolist() == [1.0, 2.5, 3.0]
+    assert records.best_splits.tolist() == [1.0, 2.0, 3.0]
+    assert records.run_count == 4
+    assert SpeedrunRecords.load_from_file(str(tmp_path/"records.json")).pb == 6.5
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 5000])
+def test_history_from_splits_file(splits_file, tmp_path, batch_size):
+    livesplit.import_splits(splits_file, str(tmp_path/"records.json"), str(tmp_path), batch_size)
+    history = load_database(str(tmp_path), "Game - Any%")
+
+    # The attempt reset before the first split is skipped
+    assert history["a"] == [1.5, 1.25, 1.0]
+    assert history["b"] == [2.0, None, 2.5]
+    assert history["a (2)"] == [3.25, None, 3.0]
+    assert history["__final_time"] == [6.75, None, 6.5]
+    assert columnar.get_row_count(columnar.get_store_dir(str(tmp_path), "Game - Any%")) == 3
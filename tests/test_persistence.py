@@ -0,0 +1,81 @@
+from pysplitter.core.persistence import PersistenceWorker, write_file_atomically
+from pysplitter.core.records import SpeedrunRecords
+import threading
+import os
+import pytest
+
+
+def test_atomic_write(tmp_path):
+    file_name = str(tmp_path/"file.json")
+    write_file_atomically(file_name, "first")
+    write_file_atomically(file_name, "second")
+
+    assert open(file_name).read() == "second"
+    assert os.listdir(tmp_path) == ["file.json"]
+
+
+def test_writes_coalesced(tmp_path):
+    worker = PersistenceWorker()
+    file_name = str(tmp_path/"file.json")
+    written_contents = []
+
+    blocker = threading.Event()
+    worker.submit(blocker.wait)
+    for i in range(10):
+        worker.write_file(file_name, str(i))
+    worker.submit(lambda: written_contents.append(open(file_name).read()))
+    blocker.set()
+    worker.flush()
+
+    assert written_contents == ["9"]
+    worker.stop()
+    assert not worker.is_running
+
+
+def test_jobs_ordered_and_flushed_on_stop(tmp_path):
+    worker = PersistenceWorker()
+    results = []
+    for i in range(100):
+        worker.submit(results.append, i)
+    worker.stop()
+
+    assert results == list(range(100))
+
+
+def test_records_roundtrip(tmp_path):
+    file_name = str(tmp_path/"records.json")
+    records = SpeedrunRecords("run", ["a", "b"], pb_splits=[1., 2.], pb=3., best_splits=[1., 2.])
+    worker = PersistenceWorker()
+    worker.write_file(file_name, records.dumps())
+    worker.stop()
+
+    loaded_records = SpeedrunRecords.load_from_file(file_name)
+    assert loaded_records.pb_splits.tolist() == [1., 2.] and loaded_records.pb == 3.
+
+
+def test_write_outcome_reported(tmp_path):
+    worker = PersistenceWorker()
+    outcomes = []
+    worker.write_file(str(tmp_path/"file.json"), "content", outcomes.append)
+    worker.write_file(str(tmp_path/"missing"/"file.json"), "content", outcomes.append)
+    with pytest.warns(UserWarning, match="Background write failed"):
+        worker.stop()
+
+    assert outcomes[0] is None
+    assert isinstance(outcomes[1], OSError)
+
+
+def test_coalesced_writes_share_outcome(tmp_path):
+    worker = PersistenceWorker()
+    file_name = str(tmp_path/"file.json")
+    outcomes = []
+
+    blocker = threading.Event()
+    worker.submit(blocker.wait)
+    for i in range(3):
+        worker.write_file(file_name, str(i), lambda error, i=i: outcomes.append((i, error)))
+    blocker.set()
+    worker.stop()
+
+    assert outcomes == [(0, None), (1, None), (2, None)]
+    assert open(file_name).read() == "2"
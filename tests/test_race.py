@@ -0,0 +1,59 @@
+from pysplitter.core.race import Race
+from pysplitter.core.records import SpeedrunRecords
+from pysplitter.core.splitter import TimeInformation
+from time import perf_counter_ns
+
+
+def get_race(runner_number=3):
+    return Race([SpeedrunRecords(f"runner {i}", ["a", "b"]) for i in range(runner_number)])
+
+
+def test_race_starts_all_runners():
+    race = get_race()
+    start = perf_counter_ns()
+    race.split(1, start)
+
+    assert race.is_ongoing
+    assert all(splitter.get_split_timestamps().tolist() == [start] for splitter in race.splitters)
+
+
+def test_splits_routed_per_runner():
+    race = get_race()
+    start = perf_counter_ns()
+    race.start(start)
+    race.split(1, start + 10_000_000)
+    race.split(1, start + 30_000_000)
+    race.split(2, start + 20_000_000)
+
+    assert [splitter.get_current_segment_index() for splitter in race.splitters] == [0, 2, 1]
+    assert race.splitters[1].has_run_ended
+    assert [records.name for records, _, _ in race.get_finished_runs()] == ["runner 1"]
+    assert race.get_finished_runs()[0][2] == 0.03
+
+    race.undo_split(2)
+    assert race.splitters[2].get_current_segment_index() == 0
+
+
+def test_reset_runner_leaves_race():
+    race = get_race()
+    start = perf_counter_ns()
+    race.start(start)
+    race.reset(0)
+    race.split(0, start + 10_000_000)
+
+    assert race.splitters[0].is_ready
+    assert race.is_ongoing
+
+    race.reset()
+    assert race.is_ready and not race.is_ongoing
+
+
+def test_shared_current_time():
+    race = get_race(2)
+    start = perf_counter_ns()
+    race.start(start)
+    race.split(0, start + 20_000_000)
+
+    current_time = start + 50_000_000
+    assert [splitter.get_time(TimeInformation.CURRENT_SEGMENT, current_time) for splitter in race.splitters] == [0.03, 0.05]
+    assert race.get_time_until_display_change(1, current_time) == 0.02
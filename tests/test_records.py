@@ -0,0 +1,145 @@
+import math
+from pysplitter.core import codec
+from pysplitter.core.records import SpeedrunRecords, InvalidRecordsError, compile_type_checker
+import pytest
+
+
+records_content = {
+        "name": "run",
+        "segment_names": ["a", "b"],
+        "pb": 3.,
+        "pb_splits": [1., 2.],
+        "best_splits": [0.5, 1.5],
+        "run_count": 4,
+    }
+
+
+@pytest.mark.parametrize("types, value, expected", [
+        ([float], 1., True),
+        ([float], 1, False),
+        ([list, str], ["a", "b"], True),
+        ([list, str], ["a", 1], False),
+        ([list, float], "a", False),
+        ([list, list, int], [[1], [2, 3]], True),
+        ([list, list, int], [[1], [2, None]], False),
+    ])
+def test_type_checker(types, value, expected):
+    assert compile_type_checker(types)(value) == expected
+
+
+@pytest.mark.parametrize("codec_name", codec.codecs.keys())
+def test_records_roundtrip(tmp_path, monkeypatch, codec_name):
+    monkeypatch.setattr(codec, "codec", codec.codecs[codec_name])
+    file_name = str(tmp_path/"records.json")
+    with open(file_name, "w") as file_stream:
+        file_stream.write(codec.dumps(records_content, indent=True))
+
+    records = SpeedrunRecords.load_from_file(file_name)
+    records.write_to_file(file_name)
+    assert codec.load_file(file_name) == records_content
+
+
+@pytest.mark.skipif(len(codec.codecs) < 2, reason="orjson not installed")
+@pytest.mark.parametrize("indent", [True, False])
+def test_codecs_same_layout(indent):
+    records = SpeedrunRecords("Zelda – any%", ["Épée", "b"], pb_splits=[1.5, 2.], pb=3.5, best_splits=[None, 1.25])
+    contents = {codec_class.dumps(codec.loads(records.dumps()), indent) for codec_class in codec.codecs.values()}
+    assert len(contents) == 1
+
+
+def test_invalid_records(tmp_path):
+    file_name = str(tmp_path/"records.json")
+    with open(file_name, "w") as file_stream:
+        file_stream.write(codec.dumps({**records_content, "pb_splits": [1., "2"]}))
+
+    with pytest.raises(InvalidRecordsError):
+        SpeedrunRecords.load_from_file(file_name)
+
+    with open(file_name, "w") as file_stream:
+        file_stream.write("{")
+    with pytest.raises(InvalidRecordsError):
+        SpeedrunRecords.load_from_file(file_name)
+
+
+def test_partial_sums():
+    records = SpeedrunRecords("run", ["a", "b", "c"], pb_splits=[1., 2., 3.], pb=6., best_splits=[0.5, None, 2.5])
+
+    assert [records.get_prefix_sum("pb_splits", i) for i in range(4)] == [0., 1., 3., 6.]
+    assert [records.get_suffix_sum("pb_splits", i) for i in range(4)] == [6., 5., 3., 0.]
+    assert [records.get_prefix_sum("best_splits", i) for i in range(4)] == [0., 0.5, None, None]
+    assert [records.get_suffix_sum("best_splits", i) for i in range(4)] == [None, None, 2.5, 0.]
+    assert records.get_sum_of_best() is None
+    assert records.get_possible_time_save(2) == 0.5
+
+
+def test_predictions():
+    records = SpeedrunRecords("run", ["a", "b", "c"], pb_splits=[1., 2., 3.], pb=6., best_splits=[0.5, 1.5, 2.5])
+
+    assert records.get_predicted_final_time(0) == 6.
+    assert records.get_predicted_final_time(1, completed_time=0.75, current_split=1.) == 5.75
+    assert records.get_predicted_final_time(1, completed_time=0.75, current_split=3.) == 6.75
+    assert records.get_predicted_final_time(3, completed_time=5.5) == 5.5
+
+    assert records.get_sum_of_best() == 4.5
+    assert records.get_possible_time_save() == 1.5
+    assert records.get_possible_time_save(1, current_split=1.75) == 0.75
+    assert records.get_possible_time_save(3) is None
+
+
+def test_partial_sums_updated_with_records():
+    records = SpeedrunRecords("run", ["a", "b"], pb_splits=[1., 2.], pb=3., best_splits=[0.5, 1.5])
+    assert records.get_sum_of_best() == 2.
+
+    records.update_times({"a": 0.25, "b": 4.}, None)
+    assert records.get_sum_of_best() == 1.75
+    assert records.get_suffix_sum("pb_splits", 0) == 3.
+
+    records.update_times({"a": 0.75, "b": 1.75}, 2.5)
+    assert records.get_suffix_sum("pb_splits", 0) == 2.5
+    assert records.get_prefix_sum("pb_splits", 1) == 0.75
+
+
+@pytest.mark.parametrize("codec_name", codec.codecs.keys())
+def test_missing_splits_roundtrip(tmp_path, monkeypatch, codec_name):
+    monkeypatch.setattr(codec, "codec", codec.codecs[codec_name])
+    file_name = str(tmp_path/"records.json")
+    records = SpeedrunRecords("run", ["a", "b", "c"], best_splits=[0.1+0.2, None, 1e-300])
+    records.write_to_file(file_name)
+
+    content = codec.load_file(file_name)
+    assert "pb_splits" not in content
+    assert content["best_splits"] == [0.1+0.2, None, 1e-300]
+
+    loaded_records = SpeedrunRecords.load_from_file(file_name)
+    assert loaded_records.dumps() == records.dumps()
+    for information in ["pb_splits", "best_splits"]:
+        loaded_splits, splits = getattr(loaded_records, information), getattr(records, information)
+        assert len(loaded_splits) == len(splits)
+        assert all(loaded_split == split or (math.isnan(loaded_split) and math.isnan(split))
+                        for loaded_split, split in zip(loaded_splits, splits))
+    assert math.isnan(loaded_records.best_splits[1])
+    assert loaded_records.get_prefix_sum("pb_splits", 1) is None
+
+
+def test_new_records_detection():
+    records = SpeedrunRecords("run", ["a", "b", "c"], pb_splits=[1., 2., 3.], pb=6., best_splits=[0.5, None, 2.5])
+
+    assert not records.has_new_records({"a": 0.75, "b": None, "c": 2.5}, None)
+    assert records.has_new_records({"a": 0.75, "b": 4., "c": None}, None)
+    assert records.has_new_records({"a": 0.25, "b": None, "c": None}, None)
+    assert records.has_new_records({"a": 1., "b": 2., "c": 2.75}, 5.75)
+
+    records.update_times({"a": 0.75, "b": 4., "c": 2.}, 6.75)
+    assert records.best_splits.tolist() == [0.5, 4., 2.]
+    assert records.pb == 6. and records.pb_splits.tolist() == [1., 2., 3.]
+    assert records.run_count == 1
+
+
+def test_file_outdated_by_new_records():
+    records = SpeedrunRecords("run", ["a", "b"], pb_splits=[1., 2.], pb=3., best_splits=[0.5, 1.5])
+
+    records.update_times({"a": 1., "b": 2.5}, 3.5)
+    assert records.records_file_up_to_date
+
+    records.update_times({"a": 0.25, "b": 2.5}, 3.5)
+    assert not records.records_file_up_to_date
@@ -0,0 +1,56 @@
+from pysplitter.core.recovery import RecoveryRing
+from pysplitter.core.splitter import Splitter
+import pytest
+
+
+segment_names = ["a", "b", "c"]
+
+
+def get_ring(tmp_path, capacity=len(segment_names)+1):
+    ring = RecoveryRing(str(tmp_path/"recovery.ring"), capacity)
+    ring.set_run_information("run", segment_names)
+    return ring
+
+
+def test_interrupted_run_recovered(tmp_path):
+    ring = get_ring(tmp_path)
+    for timestamps in [[10], [10, 2_000_000_010], [10, 2_000_000_010, 2_500_000_010]]:
+        ring.record_splits(timestamps)
+
+    name, segment_times, final_time = RecoveryRing.load_interrupted_run(ring.file_name)
+    assert name == "run"
+    assert list(segment_times.values()) == [2.0, 0.5, None]
+    assert final_time is None
+
+
+def test_ended_run_recovered(tmp_path):
+    ring = get_ring(tmp_path)
+    splitter = Splitter(segment_names)
+    for i in range(len(segment_names)+1):
+        splitter.split(1_000_000_000*i)
+        ring.record_splits(splitter.get_split_timestamps())
+
+    _, segment_times, final_time = RecoveryRing.load_interrupted_run(ring.file_name)
+    assert list(segment_times.values()) == [1.0, 1.0, 1.0]
+    assert final_time == 3.0
+
+
+def test_undo_and_clear(tmp_path):
+    ring = get_ring(tmp_path)
+    ring.record_splits([0, 1_000_000_000])
+    ring.record_splits([0])
+    assert RecoveryRing.load_interrupted_run(ring.file_name) is None
+
+    ring.record_splits([0, 1_000_000_000])
+    ring.clear()
+    assert RecoveryRing.load_interrupted_run(ring.file_name) is None
+
+
+def test_ring_wraps(tmp_path):
+    ring = get_ring(tmp_path, capacity=2)
+    for split_count in range(1, 5):
+        ring.record_splits([1_000_000_000*i for i in range(split_count)])
+
+    with pytest.warns(UserWarning):
+        _, segment_times, _ = RecoveryRing.load_interrupted_run(ring.file_name)
+    assert list(segment_times.values()) == [None, None, 1.0]
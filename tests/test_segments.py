@@ -0,0 +1,76 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt5 import QtWidgets
+
+from pysplitter.config import timer_precision
+from pysplitter.core.clock import FakeClock
+from pysplitter.core.records import SpeedrunRecords
+from pysplitter.core.splitter import Splitter
+from pysplitter.ui.segments import SegmentsView
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def get_view(records, clock):
+    splitter = Splitter(records.segment_names.copy(), clock=clock)
+    return SegmentsView(records.segment_names.copy(), lambda: splitter, lambda: records), splitter
+
+
+@pytest.mark.parametrize("best_splits, shown", [([1., 1.], False), ([None, 1.], True), ([0.25, 1.], True)])
+def test_ongoing_delta(app, best_splits, shown):
+    clock = FakeClock()
+    records = SpeedrunRecords("run", ["a", "b"], pb_splits=[1., 1.], pb=2., best_splits=best_splits)
+    view, splitter = get_view(records, clock)
+
+    splitter.split()
+    clock.advance(0.5)
+    view.refresh(current_time=clock())
+    assert (view._deltas[0] != SegmentsView.EMPTY_TIME) == shown
+    if shown:
+        assert view._deltas[0].startswith("-0.5")
+
+
+def get_texts(view):
+    return list(view._times), list(view._deltas), dict(view._footer_texts)
+
+
+@pytest.mark.parametrize("pb_splits, best_splits", [([1.04, 1.], [0.25, 1.]), ([0.33, 1.], [0.12, 1.])])
+def test_refresh_scheduled_on_display_changes(app, pb_splits, best_splits):
+    clock = FakeClock()
+    records = SpeedrunRecords("run", ["a", "b"], pb_splits=pb_splits, pb=sum(pb_splits), best_splits=best_splits)
+    view, splitter = get_view(records, clock)
+    splitter.split()
+    view.refresh(current_time=clock())
+
+    # Every row offset by the records must be refreshed when its text changes
+    for _ in range(12):
+        time_until_change = view.get_time_until_display_change(timer_precision, clock())
+        texts = get_texts(view)
+        clock.advance(time_until_change-1e-3)
+        view.refresh(current_time=clock())
+        assert get_texts(view) == texts
+        clock.advance(2e-3)
+        view.refresh(current_time=clock())
+        assert get_texts(view) != texts
+
+
+def test_undo_after_run_end(app):
+    clock = FakeClock()
+    records = SpeedrunRecords("run", ["a", "b"], pb_splits=[1., 1.], pb=2., best_splits=[1., 1.])
+    view, splitter = get_view(records, clock)
+    for _ in range(3):
+        splitter.split()
+        clock.advance(1)
+        view.refresh(segment_changed=True, current_time=clock())
+    assert splitter.has_run_ended
+
+    view.erase_current_split()
+    splitter.undo_split()
+    assert view._footer_texts[SegmentsView.TOTAL_TIME] == SegmentsView.EMPTY_TIME
+    assert view._times[1] != SegmentsView.EMPTY_TIME
@@ -0,0 +1,53 @@
+from pysplitter.core import sketch
+from pysplitter.core.database import update_database
+import random
+import statistics
+import pytest
+
+
+speedrun_name = "test_run"
+random.seed(42)
+times = [random.gauss(60, 5) for i in range(5000)]
+
+
+def exact_quantile(values, quantile):
+    return statistics.quantiles(values, n=100, method="inclusive")[round(quantile*100)-1]
+
+
+@pytest.mark.parametrize("quantile", [0.1, 0.5, 0.9])
+def test_quantile_accuracy(quantile):
+    digest = sketch.TDigest()
+    for time in times:
+        digest.add(time)
+
+    assert digest.quantile(quantile) == pytest.approx(exact_quantile(times, quantile), abs=0.2)
+    assert len(digest.means) <= digest.compression
+
+
+def test_extrema():
+    digest = sketch.TDigest()
+    for time in times:
+        digest.add(time)
+    assert digest.quantile(0) == min(times)
+    assert digest.quantile(1) == max(times)
+
+
+def test_merge():
+    first, second = sketch.TDigest(), sketch.TDigest()
+    for time in times[:3000]:
+        first.add(time)
+    for time in times[3000:]:
+        second.add(time)
+    first.merge(second)
+
+    assert first.count == len(times)
+    assert first.quantile(0.5) == pytest.approx(statistics.median(times), abs=0.2)
+
+
+def test_sketches_persisted_with_database(tmp_path):
+    for time in times[:200]:
+        update_database(tmp_path, speedrun_name, {"a": time}, time)
+
+    sketches = sketch.load_sketches(tmp_path, speedrun_name)
+    assert sketches["a"].count == 200
+    assert sketches["__final_time"].quantile(0.5) == pytest.approx(statistics.median(times[:200]), abs=0.5)
@@ -1,6 +1,8 @@
 from pysplitter.core.splitter import Splitter, TimeInformation
+from pysplitter.core.latency import LatencyHistogram
+from pysplitter.core.clock import FakeClock
 import pytest
-from time import sleep
+from time import perf_counter_ns
 
 
 segment_names = ["a", "b", "c", "d"]
@@ -67,32 +69,35 @@ def test_unfinishedrunreset_flags():
 
 
 def test_gettime_segment():
-    splitter = Splitter(segment_names)
+    clock = FakeClock()
+    splitter = Splitter(segment_names, clock=clock)
     splitter.split()
 
     for split in splits:
-        sleep(split)
+        clock.advance(split)
         compare_time(splitter.get_time(TimeInformation.CURRENT_SEGMENT), split)
         splitter.split()
 
 
 def test_gettime_total():
-    splitter = Splitter(segment_names)
+    clock = FakeClock()
+    splitter = Splitter(segment_names, clock=clock)
     splitter.split()
 
     for split in splits:
-        sleep(split)
+        clock.advance(split)
         splitter.split()
 
     compare_time(splitter.get_time(TimeInformation.CURRENT_TOTAL_TIME), sum(splits))
 
 
 def test_gettime_allsegments():
-    splitter = Splitter(segment_names)
+    clock = FakeClock()
+    splitter = Splitter(segment_names, clock=clock)
     splitter.split()
 
     for split in splits:
-        sleep(split)
+        clock.advance(split)
         splitter.split()
     segment_times, final_time = splitter.get_time(TimeInformation.ALL_SEGMENTS)
 
@@ -102,15 +107,141 @@ def test_gettime_allsegments():
 
 
 def test_timesfixed_afterended():
-    splitter = Splitter(segment_names)
+    clock = FakeClock()
+    splitter = Splitter(segment_names, clock=clock)
     splitter.split()
 
     for split in splits:
-        sleep(split)
+        clock.advance(split)
         splitter.split()
-    sleep(0.1)
+    clock.advance(0.1)
 
     segment_times, final_time = splitter.get_time(TimeInformation.ALL_SEGMENTS)
     compare_time(final_time, sum(splits))
     for expected_time, actual_time in zip(splits, segment_times.values()):
         compare_time(expected_time, actual_time)
+
+
+def test_displaychange_delay():
+    splitter = Splitter(segment_names)
+    assert splitter.get_time_until_display_change(1) is None
+
+    splitter.split()
+    for precision in [0, 1, 3]:
+        assert 0 < splitter.get_time_until_display_change(precision) <= 10**-precision
+
+    for split in splits:
+        splitter.split()
+    assert splitter.get_time_until_display_change(1) is None
+
+
+def test_segmentdurations_incremental():
+    splitter = Splitter(segment_names)
+    splitter.split()
+    assert len(splitter.get_segment_durations()) == 0
+
+    splitter.split()
+    splitter.split()
+    durations = splitter.get_segment_durations()
+    assert len(durations) == 2 and durations.readonly
+
+    version = splitter.version
+    splitter.undo_split()
+    assert splitter.version != version
+    assert len(splitter.get_segment_durations()) == 1
+
+
+def test_allsegments_cached_by_version():
+    splitter = Splitter(segment_names)
+    splitter.split()
+    splitter.split()
+
+    all_segments = splitter.get_time(TimeInformation.ALL_SEGMENTS)
+    assert splitter.get_time(TimeInformation.ALL_SEGMENTS) is all_segments
+    assert list(all_segments[0].values())[1:] == [None]*(len(segment_names)-1)
+
+    splitter.split()
+    assert splitter.get_time(TimeInformation.ALL_SEGMENTS) is not all_segments
+
+
+def test_allsegments_not_mutable():
+    splitter = Splitter(segment_names)
+    splitter.split()
+    splitter.split()
+
+    segment_times, _ = splitter.get_time(TimeInformation.ALL_SEGMENTS)
+    with pytest.raises(TypeError):
+        segment_times["a"] = 0.
+    with pytest.raises(TypeError):
+        del segment_times["b"]
+
+    segment_times, _ = splitter.get_time(TimeInformation.ALL_SEGMENTS)
+    assert list(segment_times) == segment_names
+    assert segment_times["a"] != 0.
+
+
+def test_split_with_timestamp():
+    splitter = Splitter(segment_names)
+    start = perf_counter_ns()
+    splitter.split(start)
+    splitter.split(start + 20_000_000)
+
+    segment_times, _ = splitter.get_time(TimeInformation.ALL_SEGMENTS)
+    assert segment_times["a"] == 0.02
+    assert splitter.latency_histogram.count == 2
+
+
+def test_gettime_shared_current_time():
+    splitter = Splitter(segment_names)
+    start = perf_counter_ns()
+    splitter.split(start)
+    splitter.split(start + 20_000_000)
+
+    assert splitter.get_time(TimeInformation.CURRENT_SEGMENT, start + 50_000_000) == 0.03
+    assert splitter.get_time(TimeInformation.CURRENT_TOTAL_TIME, start + 50_000_000) == 0.05
+    assert splitter.get_time_until_display_change(1, start + 50_000_000) == 0.02
+
+
+@pytest.mark.parametrize("offsets, thresholds, expected", [
+        ([], [], 0.02),
+        ([0.01], [], 0.01),
+        ([-0.085], [], 0.005),
+        ([], [0.035], 0.005),
+        ([], [0.02, 0.3], 0.02),
+    ])
+def test_time_until_display_change_of_offset_values(offsets, thresholds, expected):
+    clock = FakeClock()
+    splitter = Splitter(segment_names, clock=clock)
+    splitter.split()
+    clock.advance(0.02)
+    splitter.split()
+    clock.advance(0.03)
+
+    compare_time(splitter.get_time_until_display_change(1, segment_offsets=offsets, segment_thresholds=thresholds),
+                 expected, abs=1e-9)
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram()
+    for latency in [500, 1_500, 3_000, 3_500, 2_000_000]:
+        histogram.record(latency)
+
+    assert histogram.count == 5
+    assert histogram.counts[0] == 1 and histogram.counts[1] == 1 and histogram.counts[2] == 2
+    assert histogram.get_percentile(0.5) == 4_000
+    assert histogram.get_percentile(1) == 2_000_000
+
+
+def test_listeners_notified():
+    splitter = Splitter(["a", "b"])
+    events = []
+    splitter.add_listener(lambda splitter, event: events.append((event, splitter.get_current_segment_index())))
+    start = perf_counter_ns()
+    splitter.split(start)
+    splitter.split(start + 10_000_000)
+    splitter.undo_split()
+    splitter.split(start + 20_000_000)
+    splitter.split(start + 30_000_000)
+    splitter.reset()
+
+    assert events == [("start", 0), ("split", 1), ("undo", 0), ("split", 1), ("split", 2), ("end", 2), ("reset", -1)]
@@ -0,0 +1,61 @@
+from pysplitter.core import database, sqlite_database
+import pytest
+
+
+speedrun_name = "test_run"
+runs = [
+        ({"a": 1.5, "b": 2.0, "c": 3.25}, 6.75),
+        ({"a": 1.25, "b": None, "c": None}, None),
+        ({"a": 1.0, "b": 2.5, "c": 3.0}, 6.5),
+    ]
+
+
+def add_runs(database_dir, module=sqlite_database):
+    for segment_times, final_time in runs:
+        module.update_database(database_dir, speedrun_name, segment_times, final_time)
+
+
+def test_walmode(tmp_path):
+    connection = sqlite_database.connect(tmp_path)
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    connection.close()
+
+
+def test_load_sameasjson(tmp_path):
+    add_runs(tmp_path)
+    add_runs(tmp_path, database)
+
+    assert sqlite_database.load_database(tmp_path, speedrun_name) == database.load_database(tmp_path, speedrun_name)
+
+
+def test_last_segment_times(tmp_path):
+    add_runs(tmp_path)
+    assert sqlite_database.get_last_segment_times(tmp_path, speedrun_name, "a", 2) == [1.0, 1.25]
+    assert sqlite_database.get_last_segment_times(tmp_path, speedrun_name, "b", 2) == [2.5, 2.0]
+
+
+def test_faster_than(tmp_path):
+    add_runs(tmp_path)
+    assert [time for _, time in sqlite_database.get_segment_times_faster_than(tmp_path, speedrun_name, "a", 1.5)] == [1.0, 1.25]
+    assert [final_time for *_, final_time in sqlite_database.get_attempts_faster_than(tmp_path, speedrun_name, 7)] == [6.5, 6.75]
+
+
+def test_migration(tmp_path):
+    add_runs(tmp_path, database)
+    database.compact_database(tmp_path, speedrun_name)
+    add_runs(tmp_path, database)
+    sqlite_database.migrate_json_database(tmp_path, batch_size=2)
+
+    assert sqlite_database.load_database(tmp_path, speedrun_name) == database.load_database(tmp_path, speedrun_name)
+
+    with pytest.warns(UserWarning):
+        sqlite_database.migrate_json_database(tmp_path)
+
+
+def test_speedrun_names(tmp_path):
+    assert sqlite_database.get_speedrun_names(tmp_path) == []
+    assert not sqlite_database.database_exists(tmp_path, speedrun_name)
+    add_runs(tmp_path)
+    assert sqlite_database.get_speedrun_names(tmp_path) == [speedrun_name]
+    assert sqlite_database.database_exists(tmp_path, speedrun_name)
+    assert not sqlite_database.database_exists(tmp_path, "other run")
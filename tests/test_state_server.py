@@ -0,0 +1,106 @@
+import socket
+from time import perf_counter_ns, time_ns, sleep
+
+import pytest
+
+from pysplitter.core import codec
+from pysplitter.core.records import SpeedrunRecords
+from pysplitter.core.splitter import Splitter
+from pysplitter.core.state_server import StateServer, RunPublisher, parse_address
+
+
+@pytest.fixture
+def server():
+    state_server = StateServer("127.0.0.1:0")
+    state_server.start()
+    yield state_server
+    state_server.stop()
+
+
+def connect(address):
+    client = socket.create_connection(address, timeout=5) if isinstance(address, tuple) \
+                else socket.socket(socket.AF_UNIX)
+    if not isinstance(address, tuple):
+        client.settimeout(5)
+        client.connect(address)
+    return client.makefile("rb")
+
+
+def read_message(stream):
+    return codec.loads(stream.readline())
+
+
+def get_publisher(server):
+    records = SpeedrunRecords("run", ["a", "b"], pb_splits=[1., 2.], pb=3.)
+    splitter = Splitter(records.segment_names.copy())
+    return RunPublisher(server, splitter, records)
+
+
+def test_parse_address():
+    assert parse_address("localhost:7788") == ("localhost", 7788)
+    assert parse_address("/tmp/pysplitter.sock") == (None, "/tmp/pysplitter.sock")
+    with pytest.raises(ValueError):
+        parse_address("localhost")
+
+
+def test_state_sent_on_connect(server):
+    publisher = get_publisher(server)
+    start = perf_counter_ns()
+    publisher.splitter.split(start)
+    publisher.splitter.split(start + 1_500_000_000)
+
+    stream = connect(server.get_bound_address())
+    state = read_message(stream)
+    assert state["event"] == "state"
+    assert state["run_state"] == "ongoing"
+    assert state["times"] == [1.5]
+    assert abs(state["start"] - (time_ns() - (perf_counter_ns()-start))) < 1_000_000_000
+
+
+def test_events_pushed_with_deltas(server):
+    publisher = get_publisher(server)
+    streams = [connect(server.get_bound_address()) for _ in range(2)]
+    for stream in streams:
+        assert read_message(stream)["run_state"] == "ready"
+
+    start = perf_counter_ns()
+    publisher.splitter.split(start)
+    publisher.splitter.split(start + 1_500_000_000)
+    publisher.splitter.undo_split()
+    publisher.splitter.split(start + 500_000_000)
+    publisher.splitter.split(start + 2_000_000_000)
+    publisher.splitter.reset()
+
+    for stream in streams:
+        messages = [read_message(stream) for _ in range(7)]
+        assert [message["event"] for message in messages] == ["start", "split", "undo", "split", "split", "end", "reset"]
+        assert messages[1]["delta"] == 0.5
+        assert messages[2]["segment"] == 0
+        assert messages[3]["delta"] == -0.5
+        assert messages[4] == {"event": "split", "segment": 1, "time": 1.5, "delta": -0.5,
+                               "total_time": 2., "total_delta": -1.}
+        assert messages[5] == {"event": "end", "final_time": 2., "delta": -1.}
+
+
+def test_closed_client_dropped_without_broadcast(server):
+    get_publisher(server)
+    client = socket.create_connection(server.get_bound_address(), timeout=5)
+    assert read_message(client.makefile("rb"))["event"] == "state"
+    assert server.client_count == 1
+
+    client.close()
+    deadline = perf_counter_ns() + 5_000_000_000
+    while server.client_count and perf_counter_ns() < deadline:
+        sleep(0.01)
+    assert server.client_count == 0
+
+
+def test_unix_socket(tmp_path):
+    socket_file = str(tmp_path/"state.sock")
+    state_server = StateServer(socket_file)
+    state_server.start()
+    try:
+        get_publisher(state_server)
+        assert read_message(connect(socket_file))["name"] == "run"
+    finally:
+        state_server.stop()
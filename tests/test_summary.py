@@ -0,0 +1,43 @@
+from pysplitter.core import summary
+from pysplitter.core.database import update_database, load_database
+import statistics
+import pytest
+
+
+speedrun_name = "test_run"
+times = [3.5, 2.25, None, 4.0, 3.0, 2.75]
+
+
+def test_welford_matches_batch():
+    segment_statistics = summary.SegmentStatistics()
+    for time in times:
+        segment_statistics.add(time)
+
+    recorded_times = [time for time in times if time is not None]
+    assert segment_statistics.count == len(recorded_times)
+    assert segment_statistics.mean == pytest.approx(statistics.mean(recorded_times))
+    assert segment_statistics.std == pytest.approx(statistics.pstdev(recorded_times))
+    assert (segment_statistics.min, segment_statistics.max) == (2.25, 4.0)
+
+
+def test_last_times_ring(monkeypatch):
+    monkeypatch.setattr(summary, "last_times_size", 3)
+    segment_statistics = summary.SegmentStatistics()
+    for time in range(7):
+        segment_statistics.add(float(time))
+
+    assert segment_statistics.get_last_times() == [4., 5., 6.]
+
+
+def test_summary_updated_with_database(tmp_path):
+    for time in times:
+        update_database(tmp_path, speedrun_name, {"a": time, "b": 1.0}, None if time is None else time+1.0)
+
+    speedrun_summary = summary.load_summary(tmp_path, speedrun_name)
+    rebuilt_summary = summary.build_summary(load_database(tmp_path, speedrun_name))
+
+    assert speedrun_summary.keys() == rebuilt_summary.keys()
+    for segment, segment_statistics in speedrun_summary.items():
+        assert segment_statistics.count == rebuilt_summary[segment].count
+        assert segment_statistics.mean == pytest.approx(rebuilt_summary[segment].mean)
+        assert segment_statistics.get_last_times() == rebuilt_summary[segment].get_last_times()
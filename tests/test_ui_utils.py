@@ -0,0 +1,72 @@
+import os
+from time import perf_counter_ns
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+from pysplitter.ui.utils import KeyPressTimestamper
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+class Window(QtWidgets.QWidget):
+    def __init__(self, key_timestamper):
+        super().__init__()
+        self.key_timestamper = key_timestamper
+        self.timestamps = []
+
+    def keyPressEvent(self, event):
+        self.timestamps.append(self.key_timestamper.pop_timestamp(event))
+        event.accept()
+
+
+class Dialog(QtWidgets.QDialog):
+    def keyPressEvent(self, event):
+        event.accept()
+
+
+@pytest.fixture
+def widgets(app):
+    key_timestamper = KeyPressTimestamper([QtCore.Qt.Key_Space])
+    app.installEventFilter(key_timestamper)
+    window, dialog = Window(key_timestamper), Dialog()
+    yield app, window, dialog
+    app.removeEventFilter(key_timestamper)
+
+
+def press_space(app, widget, timestamp=0):
+    event = QtGui.QKeyEvent(QtCore.QEvent.KeyPress, QtCore.Qt.Key_Space, QtCore.Qt.NoModifier, " ")
+    event.setTimestamp(timestamp)
+    app.notify(widget, event)
+
+
+def test_timestamp_of_delivered_press(widgets):
+    app, window, _ = widgets
+    before = perf_counter_ns()
+    press_space(app, window)
+    assert before <= window.timestamps[0] <= perf_counter_ns()
+
+
+@pytest.mark.parametrize("event_timestamps", [(0, 0), (1000, 1100)])
+def test_press_consumed_by_dialog_leaves_no_stamp(widgets, event_timestamps):
+    app, window, dialog = widgets
+    press_space(app, dialog, event_timestamps[0])
+    if event_timestamps[0] == event_timestamps[1]:
+        app.processEvents()  # Back in the event loop, as when the dialog is closed
+
+    before = perf_counter_ns()
+    press_space(app, window, event_timestamps[1])
+    assert window.timestamps[0] >= before
+
+
+def test_stamp_dropped_after_dispatch(widgets):
+    app, window, dialog = widgets
+    press_space(app, dialog)
+    app.processEvents()
+    assert window.key_timestamper.pop_timestamp(
+            QtGui.QKeyEvent(QtCore.QEvent.KeyPress, QtCore.Qt.Key_Space, QtCore.Qt.NoModifier)) is None